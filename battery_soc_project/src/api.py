@@ -4,13 +4,17 @@ Flask ile SOC tahmin servisi
 """
 
 from flask import Flask, request, jsonify
-import joblib
 import numpy as np
 import os
-import json
+import time
 from datetime import datetime
 import logging
 
+from jobs import JobManager
+from model_registry import ModelRegistry, DEFAULT_MAX_BYTES
+from shadow import ShadowScorer
+from uncertainty import DEFAULT_QUANTILES
+
 # Flask uygulaması
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
@@ -20,34 +24,133 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global değişkenler
-model = None
-model_info = None
-feature_names = None
+registry = None
+job_manager = None
+shadow = None
 
 # Model yükleme fonksiyonu
 def load_model_artifacts():
-    global model, model_info, feature_names
+    """
+    Model kayıt defterini oluştur ve varsayılan modeli önceden yükle
 
-    models_dir = os.path.join(os.path.dirname(__file__), "../models")
-    model_path = os.path.join(models_dir, "battery_soc_model.pkl")
-    info_path = os.path.join(models_dir, "model_info.json")
+    SOC_MODEL_CACHE_MB: yüklü modeller için bellek sınırı (LRU)
+    SOC_MODEL_VARIANT=compressed: eğitimde seçilen sıkıştırılmış modelleri sun
+    """
+    global registry
 
-    if not os.path.exists(model_path) or not os.path.exists(info_path):
-        logger.error("❌ Model veya model_info.json bulunamadı.")
-        return False
+    models_dir = os.path.join(os.path.dirname(__file__), "../models")
+    max_bytes = int(float(os.environ.get("SOC_MODEL_CACHE_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+    registry = ModelRegistry(models_dir, max_bytes=max_bytes,
+                             variant=os.environ.get("SOC_MODEL_VARIANT"))
 
     try:
-        model = joblib.load(model_path)
-        with open(info_path, "r") as f:
-            model_info = json.load(f)
-
-        feature_names = model_info.get("feature_names", [])
-        logger.info(f"✓ Model yüklendi: {model_info.get('best_model_name')}")
+        registry.get(registry.default_key)
+        load_shadow_model()
         return True
+    except KeyError:
+        logger.error("❌ Model veya model_info.json bulunamadı.")
+        return False
     except Exception as e:
         logger.error(f"❌ Model yükleme hatası: {e}")
         return False
 
+def clear_shadow_model():
+    """Etkin gölge modu kapat (bekleyen partiler iptal edilir, aday pin'i kaldırılır)"""
+    global shadow
+    # Önce global değiştirilir: istek iş parçacıkları kapatılmış skorlayıcıya ulaşmaz
+    old, shadow = shadow, None
+    if old is not None:
+        old.shutdown()
+        registry.unpin(old.candidate.key)
+
+def load_shadow_model():
+    """
+    Aday modeli gölge modda yükle (varsa)
+
+    SOC_SHADOW_MODEL: aday model anahtarı (varsayılan: models/candidate/ varsa 'candidate')
+    SOC_SHADOW_WORKERS: gölge skorlama iş parçacığı sayısı (varsayılan 1)
+
+    Aday model kayıt defterinde pin'lenir: SOC_MODEL_CACHE_MB sınırına
+    sayılır ama gölge mod sürdükçe bellekten çıkarılmaz. Yeni aday
+    yüklenemezse veya özellikleri uyuşmazsa önceki gölge mod da kapatılır;
+    eski aday için istatistik toplanmaya devam etmez.
+    """
+    global shadow
+
+    key = os.environ.get("SOC_SHADOW_MODEL")
+    if not key and os.path.isdir(os.path.join(registry.models_dir, "candidate")):
+        key = "candidate"
+    if not key:
+        return None
+
+    registry.pin(key)
+    try:
+        candidate = registry.get(key)
+        primary = registry.get(registry.default_key)
+    except Exception as e:
+        logger.error(f"❌ Gölge model yüklenemedi [{key}]: {e}")
+        clear_shadow_model()
+        registry.unpin(key)
+        return None
+    if candidate.feature_names != primary.feature_names:
+        logger.error(f"❌ Gölge model [{key}] özellikleri birincil modelden farklı, gölge mod devre dışı")
+        clear_shadow_model()
+        registry.unpin(key)
+        return None
+
+    scorer = ShadowScorer(candidate, registry.default_key,
+                          max_workers=int(os.environ.get("SOC_SHADOW_WORKERS", 1)))
+    old, shadow = shadow, scorer
+    if old is not None:
+        old.shutdown()
+        if old.candidate.key != key:
+            registry.unpin(old.candidate.key)
+    logger.info(f"👥 Gölge mod etkin: {key} -> {registry.default_key} trafiği")
+    return scorer
+
+def shadow_submit(entry, features_array, predictions, seconds):
+    """Birincil modelin skorladığı partiyi gölge modele bırak (istek yolunu bekletmez)"""
+    scorer = shadow  # global aynı anda değiştirilebilir; tek okuma
+    if scorer is not None and entry.key == scorer.primary_key:
+        scorer.submit(features_array, predictions, seconds)
+
+def resolve_model(data=None):
+    """
+    İstekteki model_key / battery_id alanlarından modeli bul (gerekirse yükle)
+
+    Returns:
+        tuple: (ModelEntry veya None, hata yanıtı veya None)
+    """
+    if registry is None:
+        return None, (jsonify({"error": "Model yüklenmemiş", "status": "error"}), 503)
+    data = data or {}
+    key = registry.resolve_key(data.get("model_key"), data.get("battery_id"))
+    try:
+        return registry.get(key), None
+    except KeyError as e:
+        return None, (jsonify({"error": str(e.args[0]), "status": "error"}), 404)
+
+def get_job_manager():
+    """
+    Arka plan iş yöneticisini ilk kullanımda oluştur
+
+    SOC_JOB_WORKERS: eşzamanlı iş sayısı (varsayılan 1)
+    SOC_JOB_THREADS: iş başına çekirdek sınırı (varsayılan 1)
+    """
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager(on_published=on_model_published)
+    return job_manager
+
+def on_model_published(model_key):
+    """Yeni yayınlanan modeli önbellekten çıkar; sonraki istek diskten yükler"""
+    if registry is not None:
+        registry.invalidate(model_key)
+        logger.info(f"🔄 Yeni model yayınlandı [{model_key}], önbellek yenilendi")
+        # Yeni aday veya yeni birincil model: gölge karşılaştırmasını baştan başlat
+        if shadow is None or model_key in (shadow.candidate.key, shadow.primary_key):
+            load_shadow_model()
+
 # Hata yakalama decorator
 def handle_errors(f):
     def wrapper(*args, **kwargs):
@@ -63,30 +166,90 @@ def handle_errors(f):
     wrapper.__name__ = f.__name__
     return wrapper
 
+def clip_soc(value):
+    return max(0, min(100, float(value)))
+
+def parse_quantiles(data):
+    """İstekteki yüzdelikleri doğrula (varsayılan: DEFAULT_QUANTILES)"""
+    quantiles = data.get("quantiles", DEFAULT_QUANTILES)
+    if not isinstance(quantiles, (list, tuple)) or not quantiles:
+        raise ValueError('"quantiles" boş olmayan bir liste olmalı')
+    quantiles = [float(q) for q in quantiles]
+    if any(q < 0 or q > 1 for q in quantiles):
+        raise ValueError('"quantiles" değerleri 0 ile 1 arasında olmalı')
+    return quantiles
+
+def parse_batch(batch_features, feature_names):
+    """
+    Toplu istekteki satırları doğrula ve geçerli olanları tek float32 matriste topla
+
+    Ağaç modelleri tahminde zaten float32 kullanır; float64 ara kopya oluşturulmaz.
+
+    Returns:
+        tuple: (hatalı satırları doldurulmuş tahmin listesi, geçerli satır indeksleri, (m, p) float32 matris)
+    """
+    n_features = len(feature_names) if feature_names else None
+    predictions = [None] * len(batch_features)
+    valid_index, valid_rows = [], []
+    for i, features in enumerate(batch_features):
+        try:
+            row = np.asarray(features, dtype=np.float32).reshape(-1)
+            if n_features and len(row) != n_features:
+                raise ValueError(f"Özellik sayısı uyumsuz. Beklenen: {n_features}, Gelen: {len(row)}")
+            valid_index.append(i)
+            valid_rows.append(row)
+        except Exception as e:
+            predictions[i] = {"index": i, "error": str(e), "status": "error"}
+    features_array = np.vstack(valid_rows) if valid_rows else np.empty((0, n_features or 0), dtype=np.float32)
+    return predictions, valid_index, features_array
+
+def uncertainty_payload(interval, row, quantiles):
+    """Tek satırın belirsizlik özetini JSON'a dönüştür"""
+    return {
+        "mean": clip_soc(interval["mean"][row]),
+        "std": float(interval["std"][row]),
+        "quantiles": {f"q{q*100:g}": clip_soc(v) for q, v in zip(quantiles, interval["quantiles"][row])}
+    }
+
 # Health check
 @app.route("/health", methods=["GET"])
 @handle_errors
 def health_check():
+    entry = registry.peek(registry.default_key) if registry else None
     status = {
-        "status": "healthy" if model else "unhealthy",
-        "model_loaded": model is not None,
+        "status": "healthy" if entry else "unhealthy",
+        "model_loaded": entry is not None,
         "timestamp": datetime.now().isoformat()
     }
-    if model_info:
-        status["model_name"] = model_info.get("best_model_name", "Unknown")
-        status["model_metrics"] = model_info.get("metrics", {})
+    if entry:
+        status["model_name"] = entry.info.get("best_model_name", "Unknown")
+        status["model_metrics"] = entry.info.get("metrics", {})
     return jsonify(status)
 
 # Model info
 @app.route("/model-info", methods=["GET"])
 @handle_errors
 def get_model_info():
-    if not model_info:
-        return jsonify({"error": "Model bilgisi bulunamadı", "status": "error"}), 404
+    entry, error = resolve_model(request.args)
+    if error:
+        return error
     return jsonify({
-        "model_info": model_info,
-        "feature_count": len(feature_names),
-        "feature_names": feature_names,
+        "model_key": entry.key,
+        "model_info": entry.info,
+        "feature_count": len(entry.feature_names),
+        "feature_names": entry.feature_names,
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+# Yüklü modeller ve bellek / yükleme istatistikleri
+@app.route("/models", methods=["GET"])
+@handle_errors
+def get_models():
+    if registry is None:
+        return jsonify({"error": "Model yüklenmemiş", "status": "error"}), 503
+    return jsonify({
+        "registry": registry.stats(),
         "status": "success",
         "timestamp": datetime.now().isoformat()
     })
@@ -95,9 +258,6 @@ def get_model_info():
 @app.route("/predict", methods=["POST"])
 @handle_errors
 def predict_soc():
-    if model is None:
-        return jsonify({"error": "Model yüklenmemiş", "status": "error"}), 503
-
     data = request.get_json()
     if not data or "features" not in data:
         return jsonify({
@@ -105,6 +265,11 @@ def predict_soc():
             "status": "error"
         }), 400
 
+    entry, error = resolve_model(data)
+    if error:
+        return error
+    feature_names = entry.feature_names
+
     features = data["features"]
     if feature_names and len(features) != len(feature_names):
         return jsonify({
@@ -113,12 +278,32 @@ def predict_soc():
         }), 400
 
     features_array = np.array(features).reshape(1, -1)
-    prediction = model.predict(features_array)[0]
-    predicted_soc = max(0, min(100, float(prediction)))
+    response = {}
+    if data.get("uncertainty"):
+        if entry.leaf_table is None:
+            return jsonify({"error": "Model belirsizlik modunu desteklemiyor", "status": "error"}), 400
+        try:
+            quantiles = parse_quantiles(data)
+        except ValueError as e:
+            return jsonify({"error": str(e), "status": "error"}), 400
+        # Ağaç ortalaması model.predict ile aynıdır; ayrı bir tahmin çağrısı gerekmez
+        interval = entry.leaf_table.predict_interval(features_array, quantiles)
+        prediction = interval["mean"][0]
+        response["uncertainty"] = uncertainty_payload(interval, 0, quantiles)
+    else:
+        start = time.perf_counter()
+        predictions = entry.model.predict(features_array)
+        shadow_submit(entry, features_array, predictions, time.perf_counter() - start)
+        prediction = predictions[0]
+    if entry.drift_monitor:
+        entry.drift_monitor.update(features_array)
+    predicted_soc = clip_soc(prediction)
 
     return jsonify({
         "predicted_soc": predicted_soc,
-        "model_name": model_info.get("best_model_name", "Unknown"),
+        **response,
+        "model_key": entry.key,
+        "model_name": entry.info.get("best_model_name", "Unknown"),
         "status": "success",
         "timestamp": datetime.now().isoformat()
     })
@@ -127,26 +312,156 @@ def predict_soc():
 @app.route("/batch-predict", methods=["POST"])
 @handle_errors
 def batch_predict():
-    if model is None:
-        return jsonify({"error": "Model yüklenmemiş", "status": "error"}), 503
-
     data = request.get_json()
     if not data or "batch_features" not in data:
         return jsonify({"error": '"batch_features" gerekli', "status": "error"}), 400
 
+    entry, error = resolve_model(data)
+    if error:
+        return error
+
     batch_features = data["batch_features"]
-    predictions = []
-    for i, features in enumerate(batch_features):
-        try:
-            features_array = np.array(features).reshape(1, -1)
-            prediction = model.predict(features_array)[0]
-            predicted_soc = max(0, min(100, float(prediction)))
-            predictions.append({"index": i, "predicted_soc": predicted_soc, "status": "success"})
-        except Exception as e:
-            predictions.append({"index": i, "error": str(e), "status": "error"})
+    if data.get("uncertainty"):
+        return batch_predict_with_uncertainty(entry, data, batch_features)
+
+    predictions, valid_index, features_array = parse_batch(batch_features, entry.feature_names)
+    if valid_index:
+        # Tüm geçerli satırlar tek float32 matriste, tek tahmin çağrısıyla
+        start = time.perf_counter()
+        batch_predictions = entry.model.predict(features_array)
+        shadow_submit(entry, features_array, batch_predictions, time.perf_counter() - start)
+        for i, prediction in zip(valid_index, batch_predictions):
+            predictions[i] = {"index": i, "predicted_soc": clip_soc(prediction), "status": "success"}
+        if entry.drift_monitor:
+            entry.drift_monitor.update(features_array)
 
     return jsonify({
         "predictions": predictions,
+        "model_key": entry.key,
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+def batch_predict_with_uncertainty(entry, data, batch_features):
+    """
+    Tüm geçerli satırlar için tek vektörel geçişte ortalama, std ve yüzdelikler
+    """
+    if entry.leaf_table is None:
+        return jsonify({"error": "Model belirsizlik modunu desteklemiyor", "status": "error"}), 400
+    try:
+        quantiles = parse_quantiles(data)
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": "error"}), 400
+
+    predictions, valid_index, features_array = parse_batch(batch_features, entry.feature_names)
+    if valid_index:
+        interval = entry.leaf_table.predict_interval(features_array, quantiles)
+        for row, i in enumerate(valid_index):
+            predictions[i] = {
+                "index": i,
+                "predicted_soc": clip_soc(interval["mean"][row]),
+                "uncertainty": uncertainty_payload(interval, row, quantiles),
+                "status": "success"
+            }
+        if entry.drift_monitor:
+            entry.drift_monitor.update(features_array)
+
+    return jsonify({
+        "predictions": predictions,
+        "model_key": entry.key,
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+# Gölge model karşılaştırması
+@app.route("/model-info/shadow", methods=["GET"])
+@handle_errors
+def get_shadow_stats():
+    if shadow is None:
+        return jsonify({
+            "error": "Gölge mod etkin değil (SOC_SHADOW_MODEL veya models/candidate/)",
+            "status": "error"
+        }), 404
+    return jsonify({
+        "shadow": shadow.stats(),
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route("/model-info/shadow/reset", methods=["POST"])
+@handle_errors
+def reset_shadow_stats():
+    if shadow is None:
+        return jsonify({"error": "Gölge mod etkin değil", "status": "error"}), 404
+    shadow.reset()
+    return jsonify({"status": "success", "timestamp": datetime.now().isoformat()})
+
+# Özellik kayması (drift) skorları
+@app.route("/drift", methods=["GET"])
+@handle_errors
+def get_drift():
+    entry, error = resolve_model(request.args)
+    if error:
+        return error
+    if entry.drift_monitor is None:
+        return jsonify({
+            "error": "Referans dağılımı yok, modeli yeniden eğitin",
+            "status": "error"
+        }), 404
+    return jsonify({
+        "model_key": entry.key,
+        "drift": entry.drift_monitor.report(),
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route("/drift/reset", methods=["POST"])
+@handle_errors
+def reset_drift():
+    entry, error = resolve_model(request.get_json(silent=True))
+    if error:
+        return error
+    if entry.drift_monitor is None:
+        return jsonify({"error": "Kayma izleme etkin değil", "status": "error"}), 404
+    entry.drift_monitor.reset()
+    return jsonify({"status": "success", "timestamp": datetime.now().isoformat()})
+
+@app.route("/jobs/<kind>", methods=["POST"])
+@handle_errors
+def submit_job(kind):
+    """ingest veya train işini kuyruğa al (hemen döner, 202)"""
+    params = request.get_json(silent=True) or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "JSON nesnesi bekleniyordu", "status": "error"}), 400
+    try:
+        job = get_job_manager().submit(kind, params)
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": "error"}), 404
+    return jsonify({
+        "job": job,
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    }), 202
+
+@app.route("/jobs", methods=["GET"])
+@handle_errors
+def list_jobs():
+    limit = int(request.args.get("limit", 50))
+    return jsonify({
+        "jobs": get_job_manager().list(limit),
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+@handle_errors
+def get_job(job_id):
+    try:
+        job = get_job_manager().get(job_id)
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0]), "status": "error"}), 404
+    return jsonify({
+        "job": job,
         "status": "success",
         "timestamp": datetime.now().isoformat()
     })
@@ -158,9 +473,18 @@ def home():
         "endpoints": [
             "GET /health",
             "GET /model-info",
+            "GET /model-info/shadow",
+            "GET /models",
             "GET /features",
+            "GET /drift",
+            "GET /jobs",
+            "GET /jobs/<job_id>",
             "POST /predict",
-            "POST /batch-predict"
+            "POST /batch-predict",
+            "POST /drift/reset",
+            "POST /model-info/shadow/reset",
+            "POST /jobs/ingest",
+            "POST /jobs/train"
         ],
         "status": "success",
         "timestamp": datetime.now().isoformat()
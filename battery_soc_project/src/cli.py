@@ -0,0 +1,276 @@
+"""
+battery-soc Komut Satırı Arayüzü
+ingest / train / serve / eda / bench alt komutları; ağır bağımlılıklar
+(pandas, sklearn, matplotlib, flask) yalnızca ilgili alt komut çalışınca yüklenir
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DATA_DIR = os.path.join(BASE_DIR, "../data/raw")
+PROCESSED_DATA_DIR = os.path.join(BASE_DIR, "../data/processed")
+REPORTS_DIR = os.path.join(BASE_DIR, "../reports")
+
+# Her alt komutun yüklediği modüller (bench bunların import süresini ölçer)
+SUBCOMMAND_IMPORTS = {
+    "ingest": ["data_preprocessing"],
+    "train": ["model"],
+    "serve": ["api"],
+    "eda": ["eda"],
+}
+
+# Alt komut başına import süresi bütçesi (ms); aşılırsa bench hata koduyla çıkar.
+# Ölçülen sürelerin ~1.5 katı: sklearn / plotly gibi ağır bir modülün tekrar
+# eager yola girmesi bütçeyi aşar (ölçüm: train ~800, serve ~570, eda ~1000 ms)
+IMPORT_BUDGET_MS = {
+    "cli": 40,
+    "ingest": 900,
+    "train": 1200,
+    "serve": 850,
+    "eda": 1500,
+}
+
+# CLI'nin kendisi yüklenirken bu modüllerin hiçbiri yüklenmemeli
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "sklearn", "matplotlib", "seaborn", "plotly", "flask", "joblib"]
+
+
+def profile_modes(value):
+    """--profile değerini doğrula (time, memory, cprofile; virgülle birleştirilebilir)"""
+    from profiling import parse_modes
+    try:
+        parse_modes(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def write_run_manifest(args, output_dir):
+    """--profile / SOC_PROFILE açıksa run_manifest.json yaz (eğitim kendi manifestini model klasörüne yazar)"""
+    from profiling import write_manifest
+    write_manifest(output_dir, entrypoint=f"battery-soc {args.command}")
+
+
+def cmd_ingest(args):
+    """Ham .mat dosyalarını işleyip CSV olarak kaydet"""
+    from data_preprocessing import BatteryDataProcessor
+
+    files = args.files or sorted(glob.glob(os.path.join(RAW_DATA_DIR, "*.mat")))
+    if not files:
+        print(f"❌ İşlenecek .mat dosyası yok: {RAW_DATA_DIR}")
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for file_path in files:
+        if not os.path.exists(file_path):
+            print(f"❌ Dosya bulunamadı: {file_path}")
+            return 1
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        output_csv = os.path.join(args.output_dir, f"{stem}_processed.csv")
+        print(f"=== BATARYA VERİSİ İŞLEME BAŞLIYOR ===\nDosya yolu: {file_path}")
+        processor = BatteryDataProcessor(compact=args.compact)
+        processor.load_nasa_battery_file(file_path)
+        processor.save_to_csv(output_csv)
+    write_run_manifest(args, args.output_dir)
+    return 0
+
+
+def cmd_train(args):
+    """Modeli eğit (standart veya bellek dışı)"""
+    if args.out_of_core:
+        from ooc_training import train_out_of_core, DEFAULT_CHUNKSIZE, DEFAULT_MAX_TREES, PROCESSED_DATA_PATH
+        train_out_of_core(args.data or PROCESSED_DATA_PATH,
+                          chunksize=args.chunksize or DEFAULT_CHUNKSIZE,
+                          max_trees=args.max_trees or DEFAULT_MAX_TREES,
+                          trees_per_chunk=args.trees_per_chunk,
+                          max_workers=args.workers, model_dir=args.model_dir)
+    else:
+        from model import train_model
+        train_model(compress=args.compress, model_dir=args.model_dir, data_path=args.data,
+                    compact=args.compact)
+    return 0
+
+
+def cmd_serve(args):
+    """Tahmin API'sini başlat"""
+    import api
+
+    print("🚀 SOC Tahmin API başlatılıyor...")
+    if not api.load_model_artifacts():
+        print("❌ Model yüklenemedi, API başlatılamadı.")
+        return 1
+    print("✓ Model yüklendi, API hazır!")
+    api.app.run(host=args.host, port=args.port, debug=args.debug)
+    return 0
+
+
+def cmd_eda(args):
+    """İşlenmiş veri için EDA raporu üret"""
+    inputs = args.inputs or sorted(glob.glob(os.path.join(PROCESSED_DATA_DIR, "*_processed.csv")))
+    if not inputs:
+        print(f"❌ İşlenmiş veri yok, önce `battery-soc ingest` çalıştırın: {PROCESSED_DATA_DIR}")
+        return 1
+
+    if args.headless or not args.show or len(inputs) > 1:
+        # Paralel, önbellekli rapor (pencere açmaz; CLI / Docker varsayılanı)
+        from eda_report import generate_fleet_reports
+        datasets = {os.path.basename(p).replace("_processed.csv", ""): p for p in inputs}
+        generate_fleet_reports(datasets, args.output, args.workers, args.dpi, args.force)
+        write_run_manifest(args, args.output)
+        return 0
+
+    from eda import BatteryEDA
+    eda = BatteryEDA(show=True, dpi=args.dpi)
+    df = eda.load_processed_data(inputs[0])
+    if df is None:
+        return 1
+    eda.generate_eda_report(df, args.output)
+    write_run_manifest(args, args.output)
+    return 0
+
+
+def parse_importtime(stderr):
+    """
+    `-X importtime` çıktısını ayrıştır
+
+    Returns:
+        tuple: (toplam süre ms, {üst düzey modül: kümülatif ms})
+    """
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # İç içe importlar girintilidir; yalnızca doğrudan yüklenenler toplanır
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return sum(top_level.values()), top_level
+
+
+def measure_import_time(modules):
+    """
+    Modülleri temiz bir alt süreçte `-X importtime` ile yükle
+
+    Returns:
+        dict: {'total_ms', 'top', 'loaded'}
+    """
+    import subprocess
+
+    code = (
+        "import sys; sys.path.insert(0, %r); import cli; " % BASE_DIR
+        + "".join(f"import {m}; " for m in modules)
+        + "print(','.join(sorted(sys.modules)))"
+    )
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=BASE_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total_ms, top_level = parse_importtime(result.stderr)
+    top = sorted(top_level.items(), key=lambda kv: -kv[1])[:5]
+    return {"total_ms": total_ms, "top": top, "loaded": set(result.stdout.strip().split(","))}
+
+
+def cmd_bench(args):
+    """Alt komut başına import süresini ölç ve bütçelerle karşılaştır"""
+    known = ["cli"] + list(SUBCOMMAND_IMPORTS)
+    targets = args.subcommands or known
+    unknown = [name for name in targets if name not in known]
+    if unknown:
+        print(f"❌ Bilinmeyen komut: {', '.join(unknown)} (seçenekler: {', '.join(known)})")
+        return 2
+    failures = 0
+
+    print("=== ⏱️  IMPORT SÜRESİ (-X importtime) ===")
+    print(f"{'komut':>8} {'ms':>9} {'bütçe':>7}  en ağır modüller")
+    for name in targets:
+        modules = SUBCOMMAND_IMPORTS.get(name, [])
+        budget = args.budget_ms if args.budget_ms is not None else IMPORT_BUDGET_MS.get(name)
+        try:
+            # Soğuk önbellek etkisini azaltmak için en iyi ölçüm alınır
+            runs = [measure_import_time(modules) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{name:>8} {'-':>9} {budget:>7}  ❌ {e}")
+            failures += 1
+            continue
+        best = min(runs, key=lambda r: r["total_ms"])
+        heaviest = ", ".join(f"{m} {ms:.0f}" for m, ms in best["top"])
+        mark = "✓" if budget is None or best["total_ms"] <= budget else "❌"
+        print(f"{name:>8} {best['total_ms']:>9.1f} {budget:>7}  {mark} {heaviest}")
+        if mark == "❌":
+            failures += 1
+
+        if name == "cli":
+            leaked = sorted(m for m in HEAVY_MODULES if m in best["loaded"])
+            if leaked:
+                print(f"❌ CLI yüklenirken ağır modüller yüklendi: {', '.join(leaked)}")
+                failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} bütçe aşımı")
+        return 1
+    print("\n✓ Tüm import süreleri bütçe içinde")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="battery-soc", description="Batarya SOC tahmin araçları")
+    parser.add_argument("--profile", type=profile_modes, default=None, metavar="MOD",
+                        help="Aşama profili: time, memory, cprofile (virgülle birleştirilebilir, ör. --profile time)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="Ham .mat dosyalarını CSV'ye dönüştür")
+    p.add_argument("files", nargs="*", help="İşlenecek .mat dosyaları (varsayılan: data/raw/*.mat)")
+    p.add_argument("--output-dir", default=PROCESSED_DATA_DIR)
+    p.add_argument("--compact", action="store_true", help="float32 / küçük tamsayı tipler, kısa CSV ondalıkları")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("train", help="Modeli eğit")
+    p.add_argument("--data", default=None, help="İşlenmiş CSV (varsayılan: B0005_processed.csv)")
+    p.add_argument("--model-dir", default=None)
+    p.add_argument("--compress", action="store_true", help="Sıkıştırma aşamasını çalıştır")
+    p.add_argument("--out-of-core", action="store_true", help="Parçalı (bellek dışı) eğitim")
+    p.add_argument("--compact", action="store_true", help="float32 özelliklerle eğit ve bellek raporu yaz")
+    p.add_argument("--chunksize", type=int, default=None)
+    p.add_argument("--max-trees", type=int, default=None, help="Bellek dışı ormanın toplam ağaç bütçesi")
+    p.add_argument("--trees-per-chunk", type=int, default=None)
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("serve", help="Tahmin API'sini başlat")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=5000)
+    p.add_argument("--debug", action="store_true")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("eda", help="EDA raporu üret")
+    p.add_argument("inputs", nargs="*", help="İşlenmiş CSV dosyaları (varsayılan: data/processed/*_processed.csv)")
+    p.add_argument("--output", default=REPORTS_DIR)
+    p.add_argument("--show", action="store_true", help="Tek dosyada grafikleri pencerede göster (etkileşimli)")
+    p.add_argument("--headless", action="store_true", help="Paralel, ekransız rapor (varsayılan; geriye dönük uyumluluk)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--dpi", type=int, default=150)
+    p.add_argument("--force", action="store_true", help="Figür önbelleğini yok say")
+    p.set_defaults(func=cmd_eda)
+
+    p = sub.add_parser("bench", help="Alt komut import sürelerini ölç")
+    p.add_argument("subcommands", nargs="*", metavar="KOMUT",
+                   help="Ölçülecek komutlar: cli, ingest, train, serve, eda (varsayılan: tümü)")
+    p.add_argument("--budget-ms", type=float, default=None, help="Tüm komutlar için tek bütçe")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from profiling import enable
+        enable(args.profile)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Kompakt Veri Tipi Modu
+Sensör özelliklerini float32, çevrim numarası / tip bayraklarını küçük
+tamsayı, batarya kimliğini kategori olarak tutar; aşama başına bellek raporu üretir
+"""
+
+import numpy as np
+import pandas as pd
+
+FEATURE_DTYPE = np.float32
+
+# float32 ~7 anlamlı basamak taşır; CSV'de 17 basamak yazmak yalnızca yer kaplar
+FLOAT_FORMAT = "%.7g"
+
+# Tamsayı sütunları: değer aralığına göre en küçük tipe indirilir (cycle -> int16, bayraklar -> int8)
+INTEGER_COLUMNS = ["cycle", "type_charge", "type_discharge"]
+CATEGORY_COLUMNS = ["battery_id"]
+
+# Filo ölçeği projeksiyonu için varsayılan satır sayısı
+FLEET_ROWS = 10_000_000
+
+# read_compact_csv sütun tiplerini bu kadar satırdan çıkarır
+SNIFF_ROWS = 1000
+
+
+def compact_frame(df):
+    """
+    DataFrame'i kompakt tiplere dönüştür
+
+    Tamsayı tipli sütunlar (INTEGER_COLUMNS'ta olmasalar da) küçültülür;
+    eksik değer içeren INTEGER_COLUMNS sütunları float32 olarak kalır.
+
+    Returns:
+        DataFrame: Kompakt kopya
+    """
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORY_COLUMNS or series.dtype == object:
+            out[col] = series.astype("category")
+        elif pd.api.types.is_bool_dtype(series):
+            out[col] = series
+        elif pd.api.types.is_integer_dtype(series) or (col in INTEGER_COLUMNS and not series.isna().any()):
+            out[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_numeric_dtype(series):
+            out[col] = series.astype(FEATURE_DTYPE)
+        else:
+            out[col] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def read_compact_csv(file_path, **kwargs):
+    """
+    İşlenmiş CSV'yi doğrudan kompakt tiplerle oku
+
+    Sütun tipleri ilk SNIFF_ROWS satırdan çıkarılır: yalnızca ondalık sütunlar
+    okunurken float32'ye dönüştürülür (float64 ara kopya oluşmaz); tamsayı ve
+    metin sütunları pandas'ın çıkarımıyla okunup sonra küçültülür / kategoriye
+    çevrilir. `chunksize` (veya `iterator`) verilirse kompakt parçalar üreten
+    bir iterator döner; kategoriler parça başına oluşur.
+    """
+    sniff_kwargs = {k: v for k, v in kwargs.items() if k not in ("chunksize", "iterator", "nrows")}
+    sample = pd.read_csv(file_path, nrows=SNIFF_ROWS, **sniff_kwargs)
+    dtype = {}
+    for col in sample.columns:
+        if col in CATEGORY_COLUMNS:
+            dtype[col] = "category"
+        elif col not in INTEGER_COLUMNS and pd.api.types.is_float_dtype(sample[col]):
+            dtype[col] = FEATURE_DTYPE
+
+    reader = pd.read_csv(file_path, dtype=dtype, **kwargs)
+    if kwargs.get("chunksize") or kwargs.get("iterator"):
+        return (compact_frame(chunk) for chunk in reader)
+    return compact_frame(reader)
+
+
+def nbytes(obj):
+    """DataFrame / Series / ndarray'in bellek kullanımı (byte)"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=False, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=False, deep=True))
+    return int(np.asarray(obj).nbytes)
+
+
+def baseline_nbytes(obj):
+    """Aynı verinin varsayılan tiplerle (float64 / int64 / object) bellek kullanımı"""
+    if isinstance(obj, pd.DataFrame):
+        return sum(baseline_nbytes(obj[col]) for col in obj.columns)
+    if isinstance(obj, pd.Series):
+        if pd.api.types.is_numeric_dtype(obj) and not isinstance(obj.dtype, pd.CategoricalDtype):
+            return len(obj) * 8
+        return int(obj.astype(object).memory_usage(index=False, deep=True))
+    return int(np.asarray(obj).size * 8)
+
+
+def memory_report(stages, fleet_rows=FLEET_ROWS, verbose=True):
+    """
+    Aşama başına kompakt ve varsayılan tip bellek karşılaştırması
+
+    Args:
+        stages (dict): {aşama adı: DataFrame / Series / ndarray}
+        fleet_rows (int): Projeksiyon için filo satır sayısı
+        verbose (bool): Tabloyu yazdır
+
+    Returns:
+        list: Aşama başına {'stage', 'rows', 'bytes', 'baseline_bytes', 'saving_pct', 'fleet_mb', 'baseline_fleet_mb'}
+    """
+    report = []
+    for name, obj in stages.items():
+        rows = len(obj)
+        compact, baseline = nbytes(obj), baseline_nbytes(obj)
+        per_row = compact / rows if rows else 0.0
+        baseline_per_row = baseline / rows if rows else 0.0
+        report.append({
+            "stage": name,
+            "rows": rows,
+            "bytes": compact,
+            "baseline_bytes": baseline,
+            "saving_pct": round(100 * (1 - compact / baseline), 1) if baseline else 0.0,
+            "fleet_mb": round(per_row * fleet_rows / 2**20, 1),
+            "baseline_fleet_mb": round(baseline_per_row * fleet_rows / 2**20, 1),
+        })
+
+    if verbose:
+        print(f"\n=== 🧮 BELLEK RAPORU (filo projeksiyonu: {fleet_rows:,} satır) ===")
+        print(f"{'aşama':>12} {'satır':>8} {'KB':>9} {'varsayılan KB':>14} {'tasarruf':>9} {'filo MB':>9} {'varsayılan MB':>14}")
+        for row in report:
+            print(f"{row['stage']:>12} {row['rows']:>8} {row['bytes']/1024:>9.1f} {row['baseline_bytes']/1024:>14.1f} "
+                  f"{row['saving_pct']:>8.1f}% {row['fleet_mb']:>9.1f} {row['baseline_fleet_mb']:>14.1f}")
+    return report
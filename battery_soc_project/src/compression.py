@@ -0,0 +1,260 @@
+"""
+Gecikme Bütçeli Model Sıkıştırma
+Ağaç sayısı, derinlik ve yaprak boyutu taraması + float32 düzleştirilmiş orman;
+doğruluk / gecikme / boyut Pareto tablosundan RMSE bütçesini karşılayan en küçük modeli seçer
+"""
+
+import copy
+import io
+import time
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.pipeline import Pipeline
+
+DEFAULT_RMSE_BUDGET = 1.0  # SOC yüzde puanı
+DEFAULT_GRID = {
+    "n_estimators": [10, 25, 50, 100],
+    "max_depth": [None, 16, 10, 6],
+    "min_samples_leaf": [1, 2, 5],
+}
+LATENCY_REPEATS = 30
+
+
+class CompactForest(BaseEstimator, RegressorMixin):
+    """
+    Düzleştirilmiş (flat) ve float32 eşik/yaprak değerli regresyon ormanı
+
+    Tüm ağaçların düğümleri tek dizilerde tutulur; tahmin, satır x ağaç
+    düğüm matrisinin derinlik kadar adımda vektörel ilerletilmesiyle yapılır.
+    Yapraklar kendilerine işaret ettiği için erken biten ağaçlar yerinde kalır.
+    Eğitilmez, `from_forest` ile dönüştürülür; `fit` yalnızca sklearn'ün
+    Pipeline içindeki tahminci denetimi (yeni sürümler) için vardır.
+    """
+
+    def fit(self, X, y=None):
+        raise NotImplementedError("CompactForest eğitilmez; CompactForest.from_forest kullanın")
+
+    def __sklearn_is_fitted__(self):
+        return hasattr(self, "roots_")
+
+    @classmethod
+    def from_forest(cls, forest, n_estimators=None, dtype=np.float32):
+        """
+        Eğitilmiş RandomForestRegressor'dan kompakt orman oluştur
+
+        Args:
+            forest (RandomForestRegressor): Eğitilmiş orman
+            n_estimators (int): Kullanılacak ilk ağaç sayısı (None: tümü)
+            dtype: Eşik ve yaprak değerleri için veri tipi
+
+        Returns:
+            CompactForest: Kompakt orman
+        """
+        trees = [est.tree_ for est in forest.estimators_[:n_estimators]]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        left, right, feature, threshold, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            own = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            value.append(tree.value[:, 0, 0])
+
+        compact = cls()
+        compact.dtype = np.dtype(dtype)
+        compact.roots_ = offsets.astype(np.int32)
+        compact.left_ = np.concatenate(left).astype(np.int32)
+        compact.right_ = np.concatenate(right).astype(np.int32)
+        compact.feature_ = np.concatenate(feature).astype(np.int16)
+        compact.threshold_ = np.concatenate(threshold).astype(dtype)
+        compact.value_ = np.concatenate(value).astype(dtype)
+        compact.max_depth_ = int(max(t.max_depth for t in trees))
+        compact.n_estimators = len(trees)
+        compact.n_features_in_ = forest.n_features_in_
+        return compact
+
+    def apply(self, X):
+        """
+        Her satır ve ağaç için ulaşılan yaprağın (global) düğüm indeksi
+
+        Returns:
+            ndarray: (n_samples, n_estimators)
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        node = np.tile(self.roots_, (len(X), 1))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth_):
+            go_left = X[rows, self.feature_[node]] <= self.threshold_[node]
+            node = np.where(go_left, self.left_[node], self.right_[node])
+        return node
+
+    def predict(self, X):
+        return self.value_[self.apply(X)].mean(axis=1, dtype=np.float64)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.roots_, self.left_, self.right_,
+                                      self.feature_, self.threshold_, self.value_))
+
+
+def artifact_size(estimator):
+    """joblib ile serileştirilmiş boyut (byte)"""
+    buffer = io.BytesIO()
+    joblib.dump(estimator, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def measure_latency(estimator, X, repeats=LATENCY_REPEATS):
+    """
+    Tekli ve toplu tahmin gecikmesi
+
+    Returns:
+        dict: {'single_ms': tek satır medyanı, 'batch_us_per_row': toplu tahminde satır başı}
+    """
+    row = X[:1]
+    estimator.predict(row)  # ısınma
+    single = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        estimator.predict(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    estimator.predict(X)
+    batch = time.perf_counter() - start
+    return {
+        "single_ms": round(float(np.median(single)) * 1000, 4),
+        "batch_us_per_row": round(batch / len(X) * 1e6, 4),
+    }
+
+
+def _sub_forest(forest, n_estimators):
+    """İlk n ağaçtan oluşan sklearn ormanı (tekli tahmin için n_jobs=1)"""
+    sub = copy.copy(forest)
+    sub.estimators_ = forest.estimators_[:n_estimators]
+    sub.n_estimators = n_estimators
+    sub.n_jobs = 1
+    return sub
+
+
+def pareto_front(rows, keys=("rmse", "size_bytes")):
+    """
+    Hiçbir anahtarda daha kötü olmayıp en az birinde daha iyi olan aday yoksa Pareto'dur
+
+    Varsayılan anahtarlar seçimle aynıdır (RMSE, boyut); gürültülü gecikme
+    ölçümü cepheyi belirlemez, tabloda yalnızca bilgi olarak gösterilir.
+    """
+    for row in rows:
+        row["pareto"] = not any(
+            all(other[k] <= row[k] for k in keys) and any(other[k] < row[k] for k in keys)
+            for other in rows if other is not row
+        )
+    return rows
+
+
+def _selection_key(row):
+    """
+    Bütçe içindeki adaylar için belirlenimci sıralama anahtarı
+
+    Önce boyut, sonra RMSE; eşitlikte ızgara parametreleri (daha az ağaç, daha sığ
+    ağaç, daha büyük yaprak, float32). Gürültülü gecikme ölçümü seçimi etkilemez.
+    """
+    depth = np.inf if row["max_depth"] is None else row["max_depth"]
+    return (row["size_bytes"], row["rmse"], row["n_estimators"], depth,
+            -row["min_samples_leaf"], row["precision"] != "float32")
+
+
+def compress_model(pipeline, X_train, y_train, X_test, y_test, rmse_budget=DEFAULT_RMSE_BUDGET,
+                   grid=None, random_state=42, n_jobs=-1):
+    """
+    Sıkıştırma taraması yap ve bütçeyi karşılayan en küçük modeli seç
+
+    Her (max_depth, min_samples_leaf) için en büyük ağaç sayısıyla bir orman
+    eğitilir; daha az ağaçlı adaylar bu ormanın ilk ağaçlarıdır (yeniden eğitim yok).
+    Her aday float64 (sklearn) ve float32 (CompactForest) olarak ölçülür.
+
+    Args:
+        pipeline (Pipeline): Eğitilmiş imputer + model pipeline'ı
+        X_train, y_train, X_test, y_test: Eğitim / test verisi
+        rmse_budget (float): Kabul edilebilir en yüksek test RMSE'si
+        grid (dict): Tarama ızgarası (varsayılan DEFAULT_GRID)
+        random_state (int): Orman tohumu
+        n_jobs (int): Aday ormanların eğitiminde kullanılacak çekirdek sayısı
+
+    Returns:
+        tuple: (seçilen pipeline, rapor dict)
+    """
+    grid = grid or DEFAULT_GRID
+    imputer = pipeline.named_steps["imputer"]
+    Xt_train = imputer.transform(X_train)
+    y_test = np.asarray(y_test, dtype=float)
+    max_trees = max(grid["n_estimators"])
+
+    rows, candidates = [], []
+    for max_depth in grid["max_depth"]:
+        for min_samples_leaf in grid["min_samples_leaf"]:
+            forest = RandomForestRegressor(
+                n_estimators=max_trees,
+                max_depth=max_depth,
+                min_samples_leaf=min_samples_leaf,
+                random_state=random_state,
+                n_jobs=n_jobs
+            ).fit(Xt_train, y_train)
+
+            for n_estimators in grid["n_estimators"]:
+                variants = {
+                    "float64": _sub_forest(forest, n_estimators),
+                    "float32": CompactForest.from_forest(forest, n_estimators),
+                }
+                for precision, estimator in variants.items():
+                    candidate = Pipeline([("imputer", imputer), ("model", estimator)])
+                    y_pred = candidate.predict(X_test)
+                    row = {
+                        "n_estimators": n_estimators,
+                        "max_depth": max_depth,
+                        "min_samples_leaf": min_samples_leaf,
+                        "precision": precision,
+                        "rmse": round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 4),
+                        "size_bytes": artifact_size(candidate),
+                        **measure_latency(candidate, X_test),
+                    }
+                    rows.append(row)
+                    candidates.append(candidate)
+
+    pareto_front(rows)
+    baseline = next((r for r in rows if r["n_estimators"] == max_trees and r["max_depth"] is None
+                     and r["min_samples_leaf"] == 1 and r["precision"] == "float64"), None)
+    within_budget = [i for i, r in enumerate(rows) if r["rmse"] <= rmse_budget]
+    if within_budget:
+        best = min(within_budget, key=lambda i: _selection_key(rows[i]))
+        selected_pipeline, selected = candidates[best], rows[best]
+        # Seçilen aday (RMSE, boyut) cephesindedir; tablo ve rapordan düşmemesi için açıkça işaretlenir
+        selected["pareto"] = True
+    else:
+        selected_pipeline, selected = pipeline, None
+
+    print(f"\n=== 🗜️  SIKIŞTIRMA PARETO TABLOSU (RMSE bütçesi: {rmse_budget}) ===")
+    print(f"{'ağaç':>5} {'derinlik':>8} {'yaprak':>6} {'tip':>8} {'RMSE':>8} {'tekli ms':>9} {'µs/satır':>9} {'KB':>9}")
+    for row in sorted((r for r in rows if r["pareto"]), key=lambda r: r["size_bytes"]):
+        mark = " ✓" if row is selected else ""
+        print(f"{row['n_estimators']:>5} {str(row['max_depth']):>8} {row['min_samples_leaf']:>6} "
+              f"{row['precision']:>8} {row['rmse']:>8.4f} {row['single_ms']:>9.3f} "
+              f"{row['batch_us_per_row']:>9.2f} {row['size_bytes']/1024:>9.1f}{mark}")
+    if selected is None:
+        print("❌ Bütçeyi karşılayan aday yok, orijinal model korunuyor")
+
+    report = {
+        "rmse_budget": rmse_budget,
+        "baseline": baseline,
+        "selected": selected,
+        "pareto": [r for r in rows if r["pareto"]],
+        "candidates_evaluated": len(rows),
+    }
+    return selected_pipeline, report
@@ -0,0 +1,342 @@
+"""
+Büyük Veri Setleri İçin Seyreltilmiş (Decimated) Dashboard
+Min/max ve LTTB seyreltme, WebGL (Scattergl) çizim ve çok çözünürlüklü
+piramitten yakınlaştırılan aralığın tembel (lazy) yüklenmesi
+"""
+
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+DEFAULT_MAX_POINTS = 2000
+PYRAMID_FACTOR = 8
+TILE_POINTS = 4096
+
+
+def minmax_decimate(x, y, n_out):
+    """
+    Min/max seyreltme: her kovadan en küçük ve en büyük noktayı tut
+
+    Tepe ve çukurlar korunduğu için zarf (envelope) görüntüsü bozulmaz.
+    Kovalar eşit boyuta tamamlanıp tek bir reshape ile vektörel işlenir.
+
+    Args:
+        x (ndarray): Sıralı x değerleri
+        y (ndarray): y değerleri
+        n_out (int): Hedef nokta sayısı
+
+    Returns:
+        ndarray: Seçilen noktaların indeksleri (artan sırada)
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    n_buckets = max(1, n_out // 2)
+    bucket_size = int(np.ceil(n / n_buckets))
+    n_buckets = int(np.ceil(n / bucket_size))
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, bucket_size)
+
+    nan_mask = np.isnan(buckets)
+    arg_min = np.where(nan_mask, np.inf, buckets).argmin(axis=1)
+    arg_max = np.where(nan_mask, -np.inf, buckets).argmax(axis=1)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    idx = np.concatenate([offsets + arg_min, offsets + arg_max])
+    idx = np.unique(idx)
+    return idx[idx < n]
+
+
+def lttb_decimate(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets seyreltme
+
+    Görsel olarak en önemli noktaları seçer; kova sayısı kadar döngü
+    döner (veri boyutu kadar değil), kova içi hesap vektöreldir.
+
+    Args:
+        x (ndarray): Sıralı x değerleri
+        y (ndarray): y değerleri
+        n_out (int): Hedef nokta sayısı
+
+    Returns:
+        ndarray: Seçilen noktaların indeksleri (artan sırada)
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= n_out or n_out < 3:
+        return valid
+
+    xv = np.asarray(x, dtype=float)[valid]
+    yv = np.asarray(y, dtype=float)[valid]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = xv[next_start:next_end].mean()
+        avg_y = yv[next_start:next_end].mean()
+
+        bx = xv[start:end]
+        by = yv[start:end]
+        area = np.abs((xv[a] - avg_x) * (by - yv[a]) - (xv[a] - bx) * (avg_y - yv[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return valid[selected]
+
+
+DECIMATORS = {
+    'minmax': minmax_decimate,
+    'lttb': lttb_decimate,
+}
+
+
+def build_pyramid(x, y, max_points=DEFAULT_MAX_POINTS, factor=PYRAMID_FACTOR):
+    """
+    Çok çözünürlüklü piramit oluştur (seviye 0 = ham veri)
+
+    Her seviye bir öncekinin min/max seyreltilmiş halidir; en kaba seviye
+    max_points'in altına inince durulur.
+
+    Returns:
+        list: [(x, y), ...] en inceden en kabaya
+    """
+    levels = [(x, y)]
+    while len(levels[-1][0]) > max_points:
+        lx, ly = levels[-1]
+        idx = minmax_decimate(lx, ly, max(max_points, len(lx) // factor))
+        levels.append((lx[idx], ly[idx]))
+    return levels
+
+
+def write_pyramid_tiles(levels, data_dir, trace_name, tile_points=TILE_POINTS):
+    """
+    Piramit seviyelerini ikili (binary) karolar halinde diske yaz
+
+    Her karo: float64 x dizisi ardından float32 y dizisi. Aynı izin önceki
+    yazımdan kalan karoları (daha fazla seviye / karo) önce silinir.
+
+    Returns:
+        list: Seviye manifestleri [{'n': ..., 'tiles': [{'file', 'x0', 'x1', 'n'}]}]
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    for old in Path(data_dir).glob(f"{trace_name}_L*.bin"):
+        old.unlink()
+    manifest = []
+    for level, (lx, ly) in enumerate(levels):
+        tiles = []
+        for t, start in enumerate(range(0, len(lx), tile_points)):
+            tx = np.ascontiguousarray(lx[start:start + tile_points], dtype='<f8')
+            ty = np.ascontiguousarray(ly[start:start + tile_points], dtype='<f4')
+            file_name = f"{trace_name}_L{level}_{t}.bin"
+            with open(os.path.join(data_dir, file_name), 'wb') as f:
+                f.write(tx.tobytes())
+                f.write(ty.tobytes())
+            tiles.append({'file': file_name, 'x0': float(tx[0]), 'x1': float(tx[-1]), 'n': int(len(tx))})
+        manifest.append({'n': int(len(lx)), 'tiles': tiles})
+    return manifest
+
+
+# Yakınlaştırmada uygun piramit seviyesinin karolarını getirip izi güncelleyen istemci kodu
+_LAZY_LOAD_JS = """
+(function() {
+    var gd = document.getElementById('{plot_id}');
+    var manifest = __MANIFEST__;
+    var cache = {};
+    var seq = 0;
+
+    // Tam görünüme dönüşte kullanılacak özet veriler zaten figürde gömülü
+    manifest.traces.forEach(function(trace) {
+        trace.overview = {x: gd.data[trace.index].x, y: gd.data[trace.index].y};
+    });
+
+    function fetchTile(tile) {
+        if (!cache[tile.file]) {
+            cache[tile.file] = fetch(manifest.base + '/' + tile.file)
+                .then(function(r) { return r.arrayBuffer(); })
+                .then(function(buf) {
+                    return {x: new Float64Array(buf, 0, tile.n),
+                            y: new Float32Array(buf, tile.n * 8, tile.n)};
+                });
+        }
+        return cache[tile.file];
+    }
+
+    function pickLevel(trace, lo, hi) {
+        var frac = Math.min(1, (hi - lo) / Math.max(trace.x1 - trace.x0, 1e-12));
+        for (var i = 0; i < trace.levels.length; i++) {
+            if (trace.levels[i].n * frac <= manifest.max_points) return trace.levels[i];
+        }
+        return trace.levels[trace.levels.length - 1];
+    }
+
+    function concat(parts, key, Ctor) {
+        var total = parts.reduce(function(s, p) { return s + p[key].length; }, 0);
+        var out = new Ctor(total), off = 0;
+        parts.forEach(function(p) { out.set(p[key], off); off += p[key].length; });
+        return out;
+    }
+
+    gd.on('plotly_relayout', function(ev) {
+        var mySeq = ++seq;
+        manifest.traces.forEach(function(trace) {
+            var ax = trace.xaxis;
+            if (ev[ax + '.autorange']) {
+                Plotly.restyle(gd, {x: [trace.overview.x], y: [trace.overview.y]}, [trace.index]);
+                return;
+            }
+            var lo = ev[ax + '.range[0]'], hi = ev[ax + '.range[1]'];
+            if (lo === undefined || hi === undefined) return;
+            var level = pickLevel(trace, lo, hi);
+            var tiles = level.tiles.filter(function(t) { return t.x1 >= lo && t.x0 <= hi; });
+            Promise.all(tiles.map(fetchTile)).then(function(parts) {
+                if (mySeq !== seq || !parts.length) return;
+                Plotly.restyle(gd, {x: [concat(parts, 'x', Float64Array)],
+                                    y: [concat(parts, 'y', Float32Array)]}, [trace.index]);
+            });
+        });
+    });
+})();
+"""
+
+
+def dashboard_panels(df):
+    """
+    interactive_dashboard ile aynı panel/sütun seçimini döndür
+
+    Returns:
+        list: [(satır, sütun, y sütunu, iz adı, renk)]
+    """
+    panels = []
+    if 'capacity' in df.columns:
+        panels.append((1, 1, 'capacity', 'Kapasite', 'blue'))
+    voltage_cols = [col for col in df.columns if 'voltage' in col.lower() and 'mean' in col.lower()]
+    if voltage_cols:
+        panels.append((1, 2, voltage_cols[0], 'Voltaj Ortalama', 'red'))
+    temp_cols = [col for col in df.columns if 'temperature' in col.lower() and 'mean' in col.lower()]
+    if temp_cols:
+        panels.append((2, 1, temp_cols[0], 'Sıcaklık', 'green'))
+    if 'estimated_soc' in df.columns:
+        panels.append((2, 2, 'estimated_soc', 'Tahmini SOC', 'purple'))
+    return panels
+
+
+def build_decimated_dashboard(df, save_path=None, x_col='cycle', group_col=None,
+                              max_points=DEFAULT_MAX_POINTS, method='lttb', show=False):
+    """
+    Seyreltilmiş, WebGL tabanlı ve tembel yüklemeli dashboard oluştur
+
+    HTML'e yalnızca her izin max_points noktalık özeti gömülür; yakınlaştırılan
+    aralığın detayı <html adı>_data/ klasöründeki piramit karolarından istenir.
+    Karolar fetch ile okunduğu için sayfa bir HTTP sunucusu üzerinden açılmalıdır
+    (örn. `python -m http.server`).
+
+    Args:
+        df (DataFrame): Veri (örnek seviyesi veya çok bataryalı olabilir)
+        save_path (str): Kayıt klasörü (opsiyonel)
+        x_col (str): x ekseni sütunu
+        group_col (str): Her grup (örn. batarya) için ayrı iz üretilecek sütun
+        max_points (int): İz başına tarayıcıya gönderilecek en fazla nokta
+        method (str): Özet seyreltme yöntemi ('lttb' veya 'minmax')
+        show (bool): Figürü ekranda göster
+
+    Returns:
+        Figure: Plotly figürü
+    """
+    print("\n=== SEYRELTİLMİŞ DASHBOARD ===")
+    decimate = DECIMATORS[method]
+
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Kapasite Trendi', 'Voltaj Analizi',
+                        'Sıcaklık Analizi', 'SOC Tahmini')
+    )
+
+    groups = [(None, df)] if group_col is None or group_col not in df.columns else list(df.groupby(group_col))
+    data_dir = None
+    if save_path:
+        data_dir = os.path.join(save_path, "interactive_dashboard_data")
+        # Önceki derlemenin karoları (artık olmayan izler / gruplar dahil) kalmasın
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    lazy_traces = []
+    total_points = 0
+    for row, col, y_col, label, color in dashboard_panels(df):
+        axis_number = (row - 1) * 2 + col
+        xaxis = 'xaxis' if axis_number == 1 else f'xaxis{axis_number}'
+        for group, gdf in groups:
+            part = gdf[[x_col, y_col]].dropna(subset=[x_col]).sort_values(x_col)
+            x = part[x_col].to_numpy(dtype=float)
+            y = part[y_col].to_numpy(dtype=float)
+            if len(x) == 0:
+                continue
+            total_points += len(x)
+
+            idx = decimate(x, y, max_points)
+            name = label if group is None else f"{label} ({group})"
+            fig.add_trace(
+                go.Scattergl(x=x[idx], y=y[idx], mode='lines', name=name,
+                             line=dict(color=color if group is None else None, width=2)),
+                row=row, col=col
+            )
+
+            if data_dir and len(x) > max_points:
+                trace_name = y_col if group is None else f"{y_col}_{re.sub(r'[^A-Za-z0-9_-]', '_', str(group))}"
+                levels = write_pyramid_tiles(build_pyramid(x, y, max_points), data_dir, trace_name)
+                lazy_traces.append({
+                    'index': len(fig.data) - 1,
+                    'xaxis': xaxis,
+                    'x0': float(x[0]),
+                    'x1': float(x[-1]),
+                    'levels': levels,
+                })
+
+    fig.update_layout(
+        height=600,
+        showlegend=True,
+        title_text="Batarya Performans Dashboard",
+        title_x=0.5
+    )
+    for row, col in [(1, 1), (1, 2), (2, 1), (2, 2)]:
+        fig.update_xaxes(title_text="Çevrim", row=row, col=col)
+    fig.update_yaxes(title_text="Kapasite (Ah)", row=1, col=1)
+    fig.update_yaxes(title_text="Voltaj (V)", row=1, col=2)
+    fig.update_yaxes(title_text="Sıcaklık (°C)", row=2, col=1)
+    fig.update_yaxes(title_text="SOC (%)", row=2, col=2)
+
+    shown_points = sum(len(trace.x) for trace in fig.data)
+    print(f"Toplam nokta: {total_points}, gönderilen nokta: {shown_points} ({method})")
+
+    if show:
+        fig.show()
+
+    if save_path:
+        html_path = os.path.join(save_path, "interactive_dashboard.html")
+        post_script = None
+        if lazy_traces:
+            manifest = {
+                'base': Path(data_dir).name,
+                'max_points': max_points,
+                'traces': lazy_traces,
+            }
+            post_script = _LAZY_LOAD_JS.replace('__MANIFEST__', json.dumps(manifest))
+        fig.write_html(html_path, include_plotlyjs='cdn', post_script=post_script)
+        print(f"✓ Seyreltilmiş dashboard kaydedildi: {html_path}")
+        if lazy_traces:
+            print(f"✓ Piramit karoları: {data_dir} ({len(lazy_traces)} iz)")
+
+    return fig
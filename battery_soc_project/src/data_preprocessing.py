@@ -8,6 +8,8 @@ import numpy as np
 import scipy.io
 from pathlib import Path
 
+from profiling import profiled, stage
+
 def safe_extract(array):
     """Nested numpy array'leri açar ve tüm elemanları döndürür"""
     while isinstance(array, np.ndarray) and array.size == 1:
@@ -15,19 +17,32 @@ def safe_extract(array):
     return array
 
 class BatteryDataProcessor:
-    def __init__(self):
+    def __init__(self, compact=False):
+        """
+        Args:
+            compact (bool): Kompakt tip modu (float32 özellikler, küçük tamsayı çevrim / bayraklar)
+
+        Kompakt mod DataFrame'e dönüşümde ve CSV'de uygulanır. Çevrim başına
+        kayıtlar birkaç skaler özet içerdiğinden float64 kalır; ingest'in tepe
+        belleğini loadmat'in okuduğu ham ölçüm dizileri belirler ve bu mod onu değiştirmez.
+        """
         self.processed_data = []
+        self.battery_id = None
+        self.compact = compact
 
     def load_nasa_battery_file(self, file_path):
         print(f"Dosya yükleniyor: {file_path}")
         try:
-            mat_data = scipy.io.loadmat(file_path)
+            with stage("load_mat"):
+                mat_data = scipy.io.loadmat(file_path)
             file_name = Path(file_path).stem
 
             if file_name in mat_data:
                 battery_data = mat_data[file_name]
+                self.battery_id = file_name
                 print(f"✓ {file_name} verisi bulundu")
-                self._extract_cycle_data(battery_data)
+                with stage("extract_cycles"):
+                    self._extract_cycle_data(battery_data)
             else:
                 print(f"❌ {file_name} anahtarı bulunamadı")
                 print("Mevcut anahtarlar:", [k for k in mat_data.keys() if not k.startswith('__')])
@@ -55,9 +70,11 @@ class BatteryDataProcessor:
         except Exception as e:
             print(f"❌ Veri çıkarma hatası: {e}")
 
+    @profiled("cycle")
     def _process_single_cycle(self, cycle, cycle_number):
         try:
             cycle_data = {'cycle': cycle_number}
+            capacity = None
 
             if hasattr(cycle, 'dtype') and cycle.dtype.names:
                 # type alanı
@@ -89,20 +106,45 @@ class BatteryDataProcessor:
                         if 'Time' in data.dtype.names:
                             tm = safe_extract(data['Time']).flatten()
                             cycle_data['time_max'] = np.max(tm)
+                        # Kapasite (yalnızca deşarj çevrimlerinde bulunur)
+                        if 'Capacity' in data.dtype.names:
+                            cap = safe_extract(data['Capacity'])
+                            if np.size(cap) > 0:
+                                capacity = float(np.ravel(cap)[-1])
 
             # SOC tahmini placeholder (0-100 arası)
             cycle_data['estimated_soc'] = 100 * (1 - (cycle_number-1)/len(cycle_data))
 
+            # Kapasite ve batarya kimliği SOC placeholder'ından sonra eklenir (alan sayısını etkilemez)
+            cycle_data['capacity'] = capacity if capacity is not None else np.nan
+            cycle_data['battery_id'] = self.battery_id
+
             return cycle_data
 
         except Exception as e:
             print(f"Çevrim {cycle_number} işlenirken hata: {e}")
             return None
 
+    def to_frame(self):
+        """İşlenmiş çevrimleri DataFrame'e dönüştür (kompakt modda küçültülmüş tiplerle)"""
+        df = pd.DataFrame(self.processed_data)
+        if self.compact:
+            from compact import compact_frame, memory_report
+            compact_df = compact_frame(df)
+            memory_report({"cycles": compact_df})
+            return compact_df
+        return df
+
     def save_to_csv(self, output_file):
         if self.processed_data:
-            df = pd.DataFrame(self.processed_data)
-            df.to_csv(output_file, index=False)
+            with stage("to_frame"):
+                df = self.to_frame()
+            with stage("write_csv"):
+                if self.compact:
+                    from compact import FLOAT_FORMAT
+                    df.to_csv(output_file, index=False, float_format=FLOAT_FORMAT)
+                else:
+                    df.to_csv(output_file, index=False)
             print(f"✓ İşlenmiş veri kaydedildi: {output_file}")
             return df
         else:
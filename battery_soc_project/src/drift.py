@@ -0,0 +1,176 @@
+"""
+Özellik Kayması (Feature Drift) İzleme
+Eğitim sırasında özellik başına referans histogramları kaydeder; API'de
+canlı trafiği sabit bellekli histogram eskizleriyle izleyip PSI / KS skorları üretir
+"""
+
+import threading
+
+import numpy as np
+
+DEFAULT_BINS = 20
+PSI_EPSILON = 1e-4
+# Yaygın kullanılan PSI eşikleri
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def build_reference_distributions(X, n_bins=DEFAULT_BINS):
+    """
+    Eğitim verisinden özellik başına referans histogramı oluştur
+
+    Kova sınırları eğitim verisinin yüzdeliklerinden seçilir; uçlardaki iki
+    kova (-inf, ilk sınır] ve (son sınır, +inf) aralık dışı değerleri toplar.
+
+    Args:
+        X (DataFrame): Eğitim özellikleri
+        n_bins (int): Hedef kova sayısı
+
+    Returns:
+        dict: Özellik adı -> {'edges', 'counts', 'missing', 'min', 'max'}
+    """
+    reference = {}
+    for col in X.columns:
+        values = X[col].to_numpy(dtype=float)
+        present = values[~np.isnan(values)]
+        if len(present) == 0:
+            continue
+        edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, present, side='left'), minlength=len(edges) + 1)
+        reference[col] = {
+            'edges': [float(e) for e in edges],
+            'counts': [int(c) for c in counts],
+            'missing': int(len(values) - len(present)),
+            'min': float(present.min()),
+            'max': float(present.max()),
+        }
+    return reference
+
+
+def population_stability_index(expected, actual, epsilon=PSI_EPSILON):
+    """
+    İki kova sayımı arasında PSI
+
+    Args:
+        expected (ndarray): Referans kova sayıları
+        actual (ndarray): Canlı kova sayıları
+
+    Returns:
+        float: PSI
+    """
+    e = np.maximum(expected / max(expected.sum(), 1), epsilon)
+    a = np.maximum(actual / max(actual.sum(), 1), epsilon)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks_statistic(expected, actual):
+    """
+    Kova sınırlarında değerlendirilen Kolmogorov-Smirnov istatistiği
+
+    Returns:
+        float: max |F_ref - F_live|
+    """
+    cdf_e = np.cumsum(expected) / max(expected.sum(), 1)
+    cdf_a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(cdf_e - cdf_a)))
+
+
+class FeatureDriftMonitor:
+    """
+    Canlı trafik için sabit bellekli histogram eskizleri
+
+    Bellek kullanımı istek sayısından bağımsızdır: özellik başına yalnızca
+    referans kova sayısı kadar sayaç, eksik değer sayacı ve min/max tutulur.
+    """
+
+    def __init__(self, reference, feature_names):
+        self.n_features = len(feature_names)
+        self.feature_names = [f for f in feature_names if f in reference]
+        self.columns = [feature_names.index(f) for f in self.feature_names]
+        self.edges = [np.asarray(reference[f]['edges']) for f in self.feature_names]
+        self.reference_counts = [np.asarray(reference[f]['counts'], dtype=float) for f in self.feature_names]
+        self.reference_range = [(reference[f]['min'], reference[f]['max']) for f in self.feature_names]
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Canlı sayaçları sıfırla"""
+        with self._lock:
+            self.counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in self.edges]
+            self.missing = np.zeros(len(self.edges), dtype=np.int64)
+            self.live_min = np.full(len(self.edges), np.inf)
+            self.live_max = np.full(len(self.edges), -np.inf)
+            self.n_observed = 0
+
+    def update(self, features_array):
+        """
+        Gelen özellik vektör(ler)ini eskizlere ekle
+
+        Args:
+            features_array (ndarray): (n, p) özellik matrisi
+        """
+        X = np.asarray(features_array, dtype=float).reshape(-1, self.n_features)
+        if not self.columns or len(X) == 0:
+            return
+        X = X[:, self.columns]
+        nan_mask = np.isnan(X)
+        bins = [np.bincount(np.searchsorted(edges, X[~nan_mask[:, j], j], side='left'),
+                            minlength=len(edges) + 1)
+                for j, edges in enumerate(self.edges)]
+        with np.errstate(invalid='ignore'):
+            col_min = np.nanmin(np.where(nan_mask, np.inf, X), axis=0)
+            col_max = np.nanmax(np.where(nan_mask, -np.inf, X), axis=0)
+
+        with self._lock:
+            for j, b in enumerate(bins):
+                self.counts[j] += b
+            self.missing += nan_mask.sum(axis=0)
+            self.live_min = np.minimum(self.live_min, col_min)
+            self.live_max = np.maximum(self.live_max, col_max)
+            self.n_observed += len(X)
+
+    def _approximate_quantiles(self, j, counts, probs):
+        """Kova sayımlarından doğrusal enterpolasyonla yüzdelik tahmini"""
+        edges = self.edges[j]
+        low = min(self.reference_range[j][0], self.live_min[j])
+        high = max(self.reference_range[j][1], self.live_max[j])
+        bounds = np.concatenate([[low], edges, [high]])
+        cdf = np.concatenate([[0.0], np.cumsum(counts) / max(counts.sum(), 1)])
+        return [float(np.interp(p, cdf, bounds)) for p in probs]
+
+    def report(self, probs=(0.05, 0.5, 0.95)):
+        """
+        Özellik başına PSI / KS skorları ve yaklaşık yüzdelikler
+
+        Returns:
+            dict: {'n_observed', 'features': {...}}
+        """
+        with self._lock:
+            counts = [c.copy() for c in self.counts]
+            missing = self.missing.copy()
+            n_observed = self.n_observed
+
+        features = {}
+        for j, name in enumerate(self.feature_names):
+            live = counts[j].astype(float)
+            ref = self.reference_counts[j]
+            psi = population_stability_index(ref, live) if live.sum() else None
+            if psi is None:
+                status = "no_data"
+            elif psi >= PSI_SIGNIFICANT:
+                status = "significant"
+            elif psi >= PSI_MODERATE:
+                status = "moderate"
+            else:
+                status = "stable"
+            features[name] = {
+                "psi": round(psi, 4) if psi is not None else None,
+                "ks": round(binned_ks_statistic(ref, live), 4) if live.sum() else None,
+                "status": status,
+                "missing": int(missing[j]),
+                "live_quantiles": dict(zip([f"p{int(p*100)}" for p in probs],
+                                           self._approximate_quantiles(j, live, probs))) if live.sum() else None,
+                "reference_quantiles": dict(zip([f"p{int(p*100)}" for p in probs],
+                                                self._approximate_quantiles(j, ref, probs))),
+            }
+        return {"n_observed": n_observed, "features": features}
@@ -7,18 +7,46 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import pearsonr
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import warnings
 warnings.filterwarnings('ignore')
 
+from profiling import stage
+
+def high_correlation_pairs(correlation_matrix, threshold=0.7, sort=True):
+    """
+    Üst üçgende |r| > threshold olan sütun çiftlerini vektörel maske ile bul
+    
+    Args:
+        correlation_matrix (DataFrame): Korelasyon matrisi
+        threshold (float): Mutlak korelasyon eşiği
+        sort (bool): Mutlak değere göre azalan sırala (False: matris sırası)
+        
+    Returns:
+        list: [{'var1', 'var2', 'correlation'}]
+    """
+    values = correlation_matrix.to_numpy()
+    upper = np.triu(np.ones(values.shape, dtype=bool), k=1)
+    rows, cols = np.nonzero(upper & (np.abs(values) > threshold))
+    corr_vals = values[rows, cols]
+    if sort:
+        order = np.argsort(-np.abs(corr_vals), kind='stable')
+        rows, cols, corr_vals = rows[order], cols[order], corr_vals[order]
+    columns = correlation_matrix.columns
+    return [{'var1': columns[i], 'var2': columns[j], 'correlation': v}
+            for i, j, v in zip(rows, cols, corr_vals)]
+
 class BatteryEDA:
-    def __init__(self):
+    def __init__(self, show=True, dpi=300):
         """
         EDA sınıfını başlat
+        
+        Args:
+            show (bool): Grafikleri ekranda göster (headless çalışmada False)
+            dpi (int): Kaydedilen PNG çözünürlüğü
         """
+        self.show = show
+        self.dpi = dpi
+        
         # Görsel tema ayarları
         plt.style.use('default')
         sns.set_palette("husl")
@@ -26,6 +54,15 @@ class BatteryEDA:
         # Plotly tema
         self.plotly_theme = 'plotly_white'
         
+    def _finish_figure(self):
+        """
+        Aktif matplotlib figürünü göster veya (headless modda) kapat
+        """
+        if self.show:
+            plt.show()
+        else:
+            plt.close()
+    
     def load_processed_data(self, file_path):
         """
         İşlenmiş veriyi yükle
@@ -53,29 +90,71 @@ class BatteryEDA:
         Args:
             df (DataFrame): Veri
         """
-        print("=== TEMEL İSTATİSTİKLER ===")
-        print(f"Veri boyutu: {df.shape}")
-        print(f"Toplam çevrim sayısı: {df['cycle'].max() if 'cycle' in df.columns else 'Bilinmiyor'}")
-        
         # Sayısal sütunlar için özet istatistik
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        print(f"\nSayısal sütun sayısı: {len(numeric_cols)}")
+        total_cycles = df['cycle'].max() if 'cycle' in df.columns else 'Bilinmiyor'
+        
+        self._print_statistics(df.shape, total_cycles, df[numeric_cols].describe(),
+                               df.isnull().sum(), len(df))
+    
+    def streaming_statistics(self, file_path, chunksize=100000, max_workers=None):
+        """
+        Belleğe sığmayan CSV için temel istatistik ve korelasyonu tek geçişte hesapla
+        
+        Args:
+            file_path (str): İşlenmiş CSV dosya yolu
+            chunksize (int): Parça başına satır sayısı
+            max_workers (int): Worker süreç sayısı
+            
+        Returns:
+            tuple: (StreamingStats, korelasyon matrisi)
+        """
+        from streaming_stats import compute_streaming_stats
+        
+        stats = compute_streaming_stats(file_path, chunksize=chunksize, max_workers=max_workers)
+        summary_stats = stats.describe()
+        total_cycles = summary_stats.loc['max', 'cycle'] if 'cycle' in stats.columns else 'Bilinmiyor'
+        
+        self._print_statistics((stats.rows, len(stats.columns)), total_cycles, summary_stats,
+                               stats.missing_values(), stats.rows)
+        
+        print("\n=== KORELASYON ANALİZİ ===")
+        correlation_matrix = stats.corr()
+        self._print_high_correlations(correlation_matrix)
+        return stats, correlation_matrix
+    
+    def _print_statistics(self, shape, total_cycles, summary_stats, missing_values, n_rows):
+        """
+        Özet istatistik ve eksik değer çıktısını yazdır
+        """
+        print("=== TEMEL İSTATİSTİKLER ===")
+        print(f"Veri boyutu: {shape}")
+        print(f"Toplam çevrim sayısı: {total_cycles}")
+        print(f"\nSayısal sütun sayısı: {len(summary_stats.columns)}")
         
         # Özet istatistik tablosu
-        summary_stats = df[numeric_cols].describe()
         print("\nÖzet İstatistikler:")
         print(summary_stats.round(3))
         
         # Eksik değer analizi
-        missing_values = df.isnull().sum()
         if missing_values.any():
             print("\nEksik Değerler:")
             for col, count in missing_values.items():
                 if count > 0:
-                    print(f"  {col}: {count} ({count/len(df)*100:.1f}%)")
+                    print(f"  {col}: {count} ({count/n_rows*100:.1f}%)")
         else:
             print("\n✓ Eksik değer bulunmuyor")
     
+    def _print_high_correlations(self, correlation_matrix, threshold=0.7):
+        """
+        Yüksek korelasyonlu çiftleri mutlak değere göre sıralı yazdır
+        """
+        high_corr_pairs = high_correlation_pairs(correlation_matrix, threshold)
+        if high_corr_pairs:
+            print(f"Yüksek Korelasyonlar (>{threshold}):")
+            for pair in high_corr_pairs:
+                print(f"  {pair['var1']} - {pair['var2']}: {pair['correlation']:.3f}")
+    
     def correlation_analysis(self, df, save_path=None):
         """
         Korelasyon analizi ve heatmap
@@ -93,21 +172,7 @@ class BatteryEDA:
         correlation_matrix = numeric_df.corr()
         
         # Yüksek korelasyonları bul (0.7'den yüksek)
-        high_corr_pairs = []
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i+1, len(correlation_matrix.columns)):
-                corr_val = correlation_matrix.iloc[i, j]
-                if abs(corr_val) > 0.7:
-                    high_corr_pairs.append({
-                        'var1': correlation_matrix.columns[i],
-                        'var2': correlation_matrix.columns[j],
-                        'correlation': corr_val
-                    })
-        
-        if high_corr_pairs:
-            print("Yüksek Korelasyonlar (>0.7):")
-            for pair in sorted(high_corr_pairs, key=lambda x: abs(x['correlation']), reverse=True):
-                print(f"  {pair['var1']} - {pair['var2']}: {pair['correlation']:.3f}")
+        self._print_high_correlations(correlation_matrix)
         
         # Heatmap oluştur
         plt.figure(figsize=(12, 10))
@@ -127,10 +192,10 @@ class BatteryEDA:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(f"{save_path}/correlation_heatmap.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{save_path}/correlation_heatmap.png", dpi=self.dpi, bbox_inches='tight')
             print(f"✓ Korelasyon heatmap kaydedildi: {save_path}/correlation_heatmap.png")
         
-        plt.show()
+        self._finish_figure()
         
         return correlation_matrix
     
@@ -148,6 +213,12 @@ class BatteryEDA:
             print("❌ Kapasite veya çevrim verisi bulunamadı")
             return
         
+        # Kapasite yalnızca deşarj çevrimlerinde ölçülür
+        df = df.dropna(subset=['capacity'])
+        if df.empty:
+            print("❌ Kapasite ölçümü içeren çevrim bulunamadı")
+            return
+        
         # Kapasite trendi
         initial_capacity = df['capacity'].iloc[0]
         final_capacity = df['capacity'].iloc[-1]
@@ -157,6 +228,14 @@ class BatteryEDA:
         print(f"Son kapasite: {final_capacity:.3f} Ah")
         print(f"Toplam kapasite kaybı: {total_degradation:.2f}%")
         
+        # Model tabanlı SOH / RUL tahmini
+        from degradation import degradation_summary
+        summary = degradation_summary(df)
+        for _, row in summary.iterrows():
+            rul = f"{row['rul_cycles']:.0f} çevrim" if not np.isnan(row['rul_cycles']) else "ufuk dışında"
+            print(f"{row['battery_id']}: SOH {row['soh']*100:.1f}%, "
+                  f"tahmini RUL {rul} (uyum RMSE: {row['fit_rmse']:.4f} Ah)")
+        
         # Görselleştirme
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         
@@ -201,10 +280,10 @@ class BatteryEDA:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(f"{save_path}/capacity_analysis.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{save_path}/capacity_analysis.png", dpi=self.dpi, bbox_inches='tight')
             print(f"✓ Kapasite analiz grafiği kaydedildi: {save_path}/capacity_analysis.png")
         
-        plt.show()
+        self._finish_figure()
     
     def voltage_analysis(self, df, save_path=None):
         """
@@ -255,10 +334,10 @@ class BatteryEDA:
             plt.tight_layout()
             
             if save_path:
-                plt.savefig(f"{save_path}/voltage_analysis.png", dpi=300, bbox_inches='tight')
+                plt.savefig(f"{save_path}/voltage_analysis.png", dpi=self.dpi, bbox_inches='tight')
                 print(f"✓ Voltaj analiz grafiği kaydedildi: {save_path}/voltage_analysis.png")
             
-            plt.show()
+            self._finish_figure()
     
     def temperature_analysis(self, df, save_path=None):
         """
@@ -322,19 +401,32 @@ class BatteryEDA:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(f"{save_path}/temperature_analysis.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{save_path}/temperature_analysis.png", dpi=self.dpi, bbox_inches='tight')
             print(f"✓ Sıcaklık analiz grafiği kaydedildi: {save_path}/temperature_analysis.png")
         
-        plt.show()
+        self._finish_figure()
     
-    def interactive_dashboard(self, df, save_path=None):
+    def interactive_dashboard(self, df, save_path=None, decimate=None, max_points=2000, method='lttb'):
         """
         Etkileşimli dashboard oluştur
         
         Args:
             df (DataFrame): Veri
             save_path (str): Kayıt yolu (opsiyonel)
+            decimate (bool): Seyreltilmiş WebGL modu (None: satır sayısı max_points'i aşarsa)
+            max_points (int): Seyreltilmiş modda iz başına en fazla nokta
+            method (str): Seyreltme yöntemi ('lttb' veya 'minmax')
         """
+        if decimate or (decimate is None and len(df) > max_points):
+            from dashboard import build_decimated_dashboard
+            group_col = 'battery_id' if 'battery_id' in df.columns else None
+            return build_decimated_dashboard(df, save_path, group_col=group_col,
+                                             max_points=max_points, method=method, show=self.show)
+        
+        # Plotly yalnızca dashboard için gerekli; modül yüklemesini yavaşlatmasın
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         print("\n=== ETKİLEŞİMLİ DASHBOARD ===")
         
         # Alt grafikler oluştur
@@ -404,35 +496,25 @@ class BatteryEDA:
         fig.update_yaxes(title_text="SOC (%)", row=2, col=2)
         
         # Göster
-        fig.show()
+        if self.show:
+            fig.show()
         
         if save_path:
             fig.write_html(f"{save_path}/interactive_dashboard.html")
             print(f"✓ Etkileşimli dashboard kaydedildi: {save_path}/interactive_dashboard.html")
     
-    def generate_eda_report(self, df, output_dir="../reports"):
+    def write_summary_report(self, df, correlation_matrix, output_dir):
         """
-        Kapsamlı EDA raporu oluştur
+        Özet rapor dosyasını (eda_summary_report.txt) yaz
         
         Args:
             df (DataFrame): Veri
+            correlation_matrix (DataFrame): Korelasyon matrisi
             output_dir (str): Çıktı klasörü
+            
+        Returns:
+            str: Rapor dosyası yolu
         """
-        import os
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        print("=== EDA RAPORU OLUŞTURULUYOR ===")
-        
-        # Tüm analizleri çalıştır
-        self.basic_statistics(df)
-        correlation_matrix = self.correlation_analysis(df, output_dir)
-        self.capacity_degradation_analysis(df, output_dir)
-        self.voltage_analysis(df, output_dir)
-        self.temperature_analysis(df, output_dir)
-        self.interactive_dashboard(df, output_dir)
-        
-        # Özet rapor dosyası oluştur
         report_path = f"{output_dir}/eda_summary_report.txt"
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write("BATARYA VERİSİ KEŞİFSEL ANALİZ RAPORU\n")
@@ -456,11 +538,51 @@ class BatteryEDA:
             # Yüksek korelasyonlar
             f.write("YÜKSEK KORELASYONLAR (>0.7):\n")
             f.write("-"*30 + "\n")
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i+1, len(correlation_matrix.columns)):
-                    corr_val = correlation_matrix.iloc[i, j]
-                    if abs(corr_val) > 0.7:
-                        f.write(f"{correlation_matrix.columns[i]} - {correlation_matrix.columns[j]}: {corr_val:.3f}\n")
+            for pair in high_correlation_pairs(correlation_matrix, 0.7, sort=False):
+                f.write(f"{pair['var1']} - {pair['var2']}: {pair['correlation']:.3f}\n")
+        
+        return report_path
+    
+    def generate_eda_report(self, df, output_dir="../reports", parallel=False, max_workers=None):
+        """
+        Kapsamlı EDA raporu oluştur
+        
+        Args:
+            df (DataFrame): Veri
+            output_dir (str): Çıktı klasörü
+            parallel (bool): Figürleri headless olarak paralel süreçlerde çiz
+            max_workers (int): Paralel modda worker süreç sayısı
+        """
+        if parallel:
+            from eda_report import generate_headless_report
+            with stage("basic_statistics"):
+                self.basic_statistics(df)
+            with stage("render_parallel"):
+                return generate_headless_report(df, output_dir, max_workers=max_workers, dpi=self.dpi)
+        
+        import os
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        print("=== EDA RAPORU OLUŞTURULUYOR ===")
+        
+        # Tüm analizleri çalıştır
+        with stage("basic_statistics"):
+            self.basic_statistics(df)
+        with stage("correlation"):
+            correlation_matrix = self.correlation_analysis(df, output_dir)
+        with stage("capacity"):
+            self.capacity_degradation_analysis(df, output_dir)
+        with stage("voltage"):
+            self.voltage_analysis(df, output_dir)
+        with stage("temperature"):
+            self.temperature_analysis(df, output_dir)
+        with stage("dashboard"):
+            self.interactive_dashboard(df, output_dir)
+        
+        # Özet rapor dosyası oluştur
+        with stage("summary_report"):
+            report_path = self.write_summary_report(df, correlation_matrix, output_dir)
         
         print(f"✓ EDA raporu tamamlandı: {report_path}")
         print(f"✓ Grafikler kaydedildi: {output_dir}")
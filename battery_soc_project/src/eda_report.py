@@ -0,0 +1,279 @@
+"""
+Headless, Paralel EDA Rapor Üretimi
+Bağımsız figürleri ayrı süreçlerde çizer, değişmeyen figürleri önbellekten atlar
+"""
+
+import matplotlib
+matplotlib.use('Agg')  # Ekransız (headless) backend - plt.show() bloklamaz
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from profiling import record, stage, worker_init
+
+CACHE_FILE = ".figure_cache.json"
+
+
+def _correlation_columns(df):
+    return list(df.select_dtypes(include=[np.number]).columns)
+
+
+def _capacity_columns(df):
+    if 'capacity' not in df.columns or 'cycle' not in df.columns:
+        return None
+    return [c for c in ['cycle', 'capacity', 'capacity_retention', 'capacity_change'] if c in df.columns]
+
+
+def _voltage_columns(df):
+    voltage_cols = [col for col in df.columns if 'voltage' in col.lower()]
+    if not voltage_cols or 'cycle' not in df.columns:
+        return None
+    return ['cycle'] + voltage_cols
+
+
+def _temperature_columns(df):
+    temp_cols = [col for col in df.columns if 'temperature' in col.lower()]
+    if not temp_cols or 'cycle' not in df.columns:
+        return None
+    return ['cycle'] + temp_cols
+
+
+def _dashboard_columns(df):
+    if 'cycle' not in df.columns:
+        return None
+    cols = ['cycle']
+    if 'capacity' in df.columns:
+        cols.append('capacity')
+    cols += [col for col in df.columns if 'voltage' in col.lower() and 'mean' in col.lower()][:1]
+    cols += [col for col in df.columns if 'temperature' in col.lower() and 'mean' in col.lower()][:1]
+    if 'estimated_soc' in df.columns:
+        cols.append('estimated_soc')
+    if 'battery_id' in df.columns:
+        cols.append('battery_id')
+    return cols
+
+
+# Figür adı -> (BatteryEDA metodu, girdi sütunlarını seçen fonksiyon, üretilen dosyalar)
+# '/' ile biten girdi klasördür; çizimden sonra içindeki dosyalar önbelleğe yazılır
+FIGURES = {
+    'correlation': ('correlation_analysis', _correlation_columns, ['correlation_heatmap.png']),
+    'capacity': ('capacity_degradation_analysis', _capacity_columns, ['capacity_analysis.png']),
+    'voltage': ('voltage_analysis', _voltage_columns, ['voltage_analysis.png']),
+    'temperature': ('temperature_analysis', _temperature_columns, ['temperature_analysis.png']),
+    'dashboard': ('interactive_dashboard', _dashboard_columns,
+                  ['interactive_dashboard.html', 'interactive_dashboard_data/']),
+}
+
+
+def figure_cache_key(figure_name, frame, dpi):
+    """
+    Figürün girdi sütunları ve verisinden önbellek anahtarı üret
+
+    Args:
+        figure_name (str): Figür adı
+        frame (DataFrame): Figürün okuduğu sütunlar
+        dpi (int): Kayıt çözünürlüğü
+
+    Returns:
+        str: SHA1 özeti
+    """
+    h = hashlib.sha1()
+    h.update(f"{figure_name}|{dpi}|{','.join(map(str, frame.columns))}".encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _load_cache(output_dir):
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(output_dir, cache):
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+
+def _output_files(figure_name, output_dir):
+    """Figürün ürettiği dosyalar (klasör girdileri içerikleriyle açılır, ör. piramit karoları)"""
+    files = []
+    for name in FIGURES[figure_name][2]:
+        if not name.endswith('/'):
+            files.append(name)
+            continue
+        folder = os.path.join(output_dir, name)
+        if os.path.isdir(folder):
+            files += sorted(name + entry for entry in os.listdir(folder))
+    return files
+
+
+def _is_cached(cache, figure_name, key, output_dir):
+    entry = cache.get(figure_name)
+    if not entry or entry.get('key') != key:
+        return False
+    return all(os.path.exists(os.path.join(output_dir, name)) for name in entry.get('files', []))
+
+
+def _render_figure(figure_name, frame, output_dir, dpi):
+    """
+    Tek bir figürü worker süreçte çiz (konsol çıktısı yakalanır)
+
+    Returns:
+        tuple: (figure_name, output_dir, yakalanan log, çizim süresi sn)
+    """
+    from eda import BatteryEDA
+
+    start = time.perf_counter()
+    eda = BatteryEDA(show=False, dpi=dpi)
+    method_name = FIGURES[figure_name][0]
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        getattr(eda, method_name)(frame, output_dir)
+    return figure_name, output_dir, log.getvalue(), time.perf_counter() - start
+
+
+def _plan_figures(df, output_dir, dpi, cache, force):
+    """
+    Çizilmesi gereken figürleri belirle
+
+    Returns:
+        tuple: (görev listesi [(figür, sütun alt kümesi, anahtar)], atlanan figürler)
+    """
+    tasks, skipped = [], []
+    for figure_name, (_, select_columns, _) in FIGURES.items():
+        columns = select_columns(df)
+        if not columns:
+            continue
+        frame = df[columns]
+        key = figure_cache_key(figure_name, frame, dpi)
+        if not force and _is_cached(cache, figure_name, key, output_dir):
+            skipped.append(figure_name)
+        else:
+            tasks.append((figure_name, frame, key))
+    return tasks, skipped
+
+
+def generate_fleet_reports(datasets, output_root="../reports", max_workers=None, dpi=150, force=False):
+    """
+    Birden çok batarya için headless EDA raporlarını paralel üret
+
+    Tüm bataryaların figür görevleri tek bir süreç havuzuna verilir; aynı anda
+    bekleyen görev sayısı sınırlandığı için yüzlerce batarya bellekte birikmez.
+    Önbellek her figür tamamlandığında kaydedilir; yarıda kesilen bir çalışmanın
+    bitmiş figürleri sonraki çalışmada yeniden çizilmez.
+
+    Args:
+        datasets (dict): Batarya adı -> CSV yolu veya DataFrame
+        output_root (str): Rapor kök klasörü (her batarya için alt klasör)
+        max_workers (int): Worker süreç sayısı (None: CPU sayısı)
+        dpi (int): Kaydedilen PNG çözünürlüğü
+        force (bool): Önbelleği yok say, tüm figürleri yeniden çiz
+
+    Returns:
+        dict: Batarya adı -> {'rendered', 'cached', 'failed', 'report'}
+    """
+    from eda import BatteryEDA
+
+    eda = BatteryEDA(show=False, dpi=dpi)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * 2
+    results = {}
+    caches = {}
+    pending = {}
+
+    def _collect(done_futures):
+        for future in done_futures:
+            battery, figure_name, key = pending.pop(future)
+            try:
+                _, output_dir, log, seconds = future.result()
+            except Exception as e:
+                print(f"❌ [{battery}/{figure_name}] çizim hatası: {e}")
+                results[battery]['failed'].append(figure_name)
+                continue
+            record(f"figure:{figure_name}", seconds)
+            caches[output_dir][figure_name] = {'key': key, 'files': _output_files(figure_name, output_dir)}
+            _save_cache(output_dir, caches[output_dir])
+            results[battery]['rendered'].append(figure_name)
+            if log.strip():
+                print(f"[{battery}/{figure_name}]\n{log.rstrip()}")
+
+    print(f"=== HEADLESS EDA RAPORU: {len(datasets)} batarya, {max_workers} worker ===")
+    with stage("render_figures"), ProcessPoolExecutor(max_workers=max_workers, initializer=worker_init) as executor:
+        for battery, source in datasets.items():
+            df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+            output_dir = str(Path(output_root) / battery) if len(datasets) > 1 else str(output_root)
+            os.makedirs(output_dir, exist_ok=True)
+
+            cache = caches.setdefault(output_dir, _load_cache(output_dir))
+            tasks, skipped = _plan_figures(df, output_dir, dpi, cache, force)
+            results[battery] = {'rendered': [], 'cached': skipped, 'failed': [], 'report': None}
+
+            # Özet rapor için korelasyon matrisi çizim olmadan ana süreçte hesaplanır
+            correlation_matrix = df.select_dtypes(include=[np.number]).corr()
+            results[battery]['report'] = eda.write_summary_report(df, correlation_matrix, output_dir)
+
+            for figure_name, frame, key in tasks:
+                if len(pending) >= max_pending:
+                    _collect([next(as_completed(pending))])
+                future = executor.submit(_render_figure, figure_name, frame, output_dir, dpi)
+                pending[future] = (battery, figure_name, key)
+
+        _collect(list(as_completed(pending)))
+
+    rendered = sum(len(r['rendered']) for r in results.values())
+    cached = sum(len(r['cached']) for r in results.values())
+    print(f"✓ Headless rapor tamamlandı: {rendered} figür çizildi, {cached} figür önbellekten atlandı")
+    return results
+
+
+def generate_headless_report(df, output_dir="../reports", max_workers=None, dpi=150, force=False):
+    """
+    Tek bir veri seti için headless EDA raporu üret
+
+    Args:
+        df (DataFrame): Veri
+        output_dir (str): Çıktı klasörü
+        max_workers (int): Worker süreç sayısı
+        dpi (int): Kaydedilen PNG çözünürlüğü
+        force (bool): Önbelleği yok say
+
+    Returns:
+        dict: {'rendered', 'cached', 'failed', 'report'}
+    """
+    results = generate_fleet_reports({'battery': df}, output_dir, max_workers, dpi, force)
+    return results['battery']
+
+
+if __name__ == "__main__":
+    import argparse
+
+    script_dir = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Headless paralel EDA raporu")
+    parser.add_argument("inputs", nargs="*",
+                        default=[str((script_dir / "../data/processed/B0005_processed.csv").resolve())],
+                        help="İşlenmiş CSV dosyaları (her biri bir batarya)")
+    parser.add_argument("--output", default=str((script_dir / "../reports").resolve()))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    datasets = {Path(p).stem.replace("_processed", ""): p for p in args.inputs}
+    generate_fleet_reports(datasets, args.output, args.workers, args.dpi, args.force)
@@ -0,0 +1,345 @@
+"""
+Arka Plan İş Kuyruğu (Ön İşleme / Eğitim)
+API'den tetiklenen ingest ve train işlerini sınırlı bir süreç havuzunda çalıştırır;
+iş durumu diskteki JSON iş tablosunda tutulur (gerçek bir kuyruk yerine)
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import get_context
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Container'da volume olarak bağlanır (docker-compose.yml); ortam değişkeniyle değiştirilebilir
+JOBS_DIR = os.environ.get("SOC_JOBS_DIR", os.path.join(BASE_DIR, "../jobs"))
+RAW_DATA_DIR = os.environ.get("SOC_RAW_DATA_DIR", os.path.join(BASE_DIR, "../data/raw"))
+PROCESSED_DATA_DIR = os.path.join(BASE_DIR, "../data/processed")
+MODELS_DIR = os.path.join(BASE_DIR, "../models")
+
+# Eğitim, tahmin servisini aç bırakmamak için düşük öncelikli ve sınırlı sayıda çekirdekle çalışır
+DEFAULT_MAX_WORKERS = 1
+DEFAULT_JOB_THREADS = 1
+JOB_NICENESS = 10
+
+ARTIFACT_FILES = ["battery_soc_model.pkl", "battery_soc_model_compressed.pkl",
+                  "run_manifest.json", "run_profile.prof", "model_info.json"]
+TERMINAL_STATES = ("succeeded", "failed", "interrupted")
+
+
+class JobStore:
+    """Her iş için bir JSON dosyası; yazımlar os.replace ile atomik"""
+
+    def __init__(self, jobs_dir=JOBS_DIR):
+        self.jobs_dir = jobs_dir
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _path(self, job_id):
+        if not job_id or os.path.basename(job_id) != job_id:
+            raise KeyError(f"Geçersiz iş kimliği: {job_id}")
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def create(self, kind, params):
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "progress": 0.0,
+            "stage": None,
+            "detail": None,
+            "stages": [],
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.save(job)
+        return job
+
+    def save(self, job):
+        path = self._path(job["id"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def get(self, job_id):
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            raise KeyError(f"İş bulunamadı: {job_id}")
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def update(self, job_id, **fields):
+        job = self.get(job_id)
+        job.update(fields)
+        self.save(job)
+        return job
+
+    def list(self, limit=50):
+        paths = sorted(glob.glob(os.path.join(self.jobs_dir, "*.json")), key=os.path.getmtime, reverse=True)
+        jobs = []
+        for path in paths[:limit]:
+            try:
+                with open(path, "r") as f:
+                    jobs.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return jobs
+
+
+class JobReporter:
+    """Worker süreçte aşama süresi ve ilerleme kaydı"""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+
+    @contextmanager
+    def stage(self, name, progress_after=None):
+        self.store.update(self.job_id, stage=name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            job = self.store.get(self.job_id)
+            job["stages"].append({"name": name, "seconds": round(time.perf_counter() - start, 3)})
+            if progress_after is not None:
+                job["progress"] = progress_after
+            self.store.save(job)
+
+    def progress(self, fraction, detail=None):
+        """Aşama içi ilerleme (ör. parça veya eğitim adımı tamamlandıkça)"""
+        self.store.update(self.job_id, progress=round(float(fraction), 4), detail=detail)
+
+
+def _worker_init(threads):
+    """Worker süreci düşük öncelikli ve sınırlı iş parçacığıyla başlat"""
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        os.nice(JOB_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def _run_job(func, job_id, jobs_dir, params):
+    """İş fonksiyonunu durum geçişleri ve hata kaydıyla sar"""
+    store = JobStore(jobs_dir)
+    store.update(job_id, status="running", started_at=datetime.now().isoformat())
+    reporter = JobReporter(store, job_id)
+    try:
+        result = func(reporter, params)
+    except Exception as e:
+        store.update(job_id, status="failed", error=f"{e}\n{traceback.format_exc()}",
+                     finished_at=datetime.now().isoformat())
+        raise
+    store.update(job_id, status="succeeded", progress=1.0, stage=None, result=result,
+                 finished_at=datetime.now().isoformat())
+    return result
+
+
+def ingest_job(reporter, params):
+    """
+    data/raw altındaki .mat dosyalarını işleyip <ad>_processed.csv olarak yaz
+
+    params:
+        files (list): İşlenecek dosya adları (varsayılan: data/raw/*.mat)
+        compact (bool): Kompakt tip modu
+    """
+    from data_preprocessing import BatteryDataProcessor
+
+    names = params.get("files") or sorted(os.path.basename(p) for p in glob.glob(os.path.join(RAW_DATA_DIR, "*.mat")))
+    if not names:
+        raise FileNotFoundError(f"İşlenecek .mat dosyası yok: {RAW_DATA_DIR}")
+
+    outputs = []
+    for i, name in enumerate(names):
+        # Yalnızca data/raw içindeki dosya adlarına izin ver
+        file_path = os.path.join(RAW_DATA_DIR, os.path.basename(name))
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Dosya bulunamadı: {file_path}")
+        output_csv = os.path.join(PROCESSED_DATA_DIR, f"{os.path.splitext(os.path.basename(name))[0]}_processed.csv")
+
+        processor = BatteryDataProcessor(compact=bool(params.get("compact")))
+        with reporter.stage(f"extract:{name}"):
+            processor.load_nasa_battery_file(file_path)
+        with reporter.stage(f"write_csv:{name}", progress_after=(i + 1) / len(names)):
+            os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+            df = processor.save_to_csv(output_csv)
+        outputs.append({"file": name, "output": os.path.relpath(output_csv, BASE_DIR),
+                        "rows": 0 if df is None else int(len(df))})
+    return {"outputs": outputs}
+
+
+def publish_artifacts(staging_dir, target_dir):
+    """
+    Hazırlık klasöründeki artifact'leri canlı klasöre taşı
+
+    Önce model dosyaları, en son model_info.json yer değiştirir; her dosya
+    os.replace ile atomik olarak taşınır. Sunucu model_info'yu okuduğunda
+    ilgili artifact zaten yerindedir. Yeni eğitimin üretmediği eski artifact'ler
+    (ör. önceki sıkıştırılmış model veya profil manifesti) model_info'dan sonra silinir.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    published = []
+    for name in ARTIFACT_FILES:
+        src = os.path.join(staging_dir, name)
+        if os.path.exists(src):
+            os.replace(src, os.path.join(target_dir, name))
+            published.append(name)
+    for name in ARTIFACT_FILES:
+        stale = os.path.join(target_dir, name)
+        if name not in published and os.path.exists(stale):
+            os.remove(stale)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    return published
+
+
+def train_job(reporter, params):
+    """
+    Modeli hazırlık klasöründe eğit ve tamamlandığında yayınla
+
+    params:
+        mode (str): 'standard' (varsayılan) veya 'out_of_core'
+        model_key (str): Yayınlanacak model anahtarı (varsayılan: default)
+        data (str): data/processed altındaki CSV adı (opsiyonel)
+        compress (bool): Sıkıştırma aşamasını çalıştır
+        compact (bool): float32 özelliklerle eğit (standart mod)
+        chunksize, max_trees, trees_per_chunk (int): out_of_core parametreleri
+    """
+    from model_registry import DEFAULT_KEY, is_valid_key
+
+    model_key = str(params.get("model_key") or DEFAULT_KEY)
+    # Kayıt defteriyle aynı kural; 'staging' hazırlık klasörüne ayrılmıştır
+    if not is_valid_key(model_key) or model_key == "staging":
+        raise ValueError(f"Geçersiz model anahtarı: {model_key}")
+    data_path = os.path.join(PROCESSED_DATA_DIR, os.path.basename(params["data"])) if params.get("data") else None
+    staging_dir = os.path.join(MODELS_DIR, "staging", reporter.job_id)
+    threads = int(os.environ.get("SOC_JOB_THREADS", DEFAULT_JOB_THREADS))
+
+    # Eğitim ilerlemesi 0-0.95 aralığına, yayınlama son %5'e karşılık gelir
+    def progress(fraction, name):
+        reporter.progress(0.95 * fraction, f"train:{name}")
+
+    with reporter.stage("train", progress_after=0.95):
+        if params.get("mode") == "out_of_core":
+            from ooc_training import train_out_of_core, DEFAULT_CHUNKSIZE, DEFAULT_MAX_TREES
+            kwargs = {"file_path": data_path} if data_path else {}
+            if params.get("trees_per_chunk"):
+                kwargs["trees_per_chunk"] = int(params["trees_per_chunk"])
+            model_info = train_out_of_core(
+                chunksize=int(params.get("chunksize", DEFAULT_CHUNKSIZE)),
+                max_trees=int(params.get("max_trees", DEFAULT_MAX_TREES)),
+                max_workers=threads, n_jobs=threads, model_dir=staging_dir,
+                progress=progress, **kwargs
+            )
+        else:
+            from model import train_model
+            model_info = train_model(compress=bool(params.get("compress")), model_dir=staging_dir,
+                                     data_path=data_path, n_jobs=threads,
+                                     compact=bool(params.get("compact")), progress=progress)
+
+    target_dir = MODELS_DIR if model_key == DEFAULT_KEY else os.path.join(MODELS_DIR, model_key)
+    with reporter.stage("publish", progress_after=1.0):
+        published = publish_artifacts(staging_dir, target_dir)
+
+    return {"model_key": model_key, "published": published, "metrics": model_info.get("metrics")}
+
+
+JOB_TYPES = {
+    "ingest": ingest_job,
+    "train": train_job,
+}
+
+
+class JobManager:
+    """
+    İşleri sınırlı bir süreç havuzuna gönderir
+
+    Havuz 'spawn' bağlamıyla ilk işte oluşturulur (Flask iş parçacıkları
+    fork edilmez). Tamamlanan eğitim işleri on_published geri çağrısıyla
+    bildirilir; API bu sayede yeni modeli kayıt defterinden yeniden yükler.
+    """
+
+    def __init__(self, jobs_dir=JOBS_DIR, max_workers=None, on_published=None):
+        self.store = JobStore(jobs_dir)
+        self.max_workers = max_workers or int(os.environ.get("SOC_JOB_WORKERS", DEFAULT_MAX_WORKERS))
+        self.on_published = on_published
+        self._executor = None
+        self._lock = Lock()
+        self._recover()
+
+    def _recover(self):
+        """Önceki süreçten kalan yarım işleri 'interrupted' olarak işaretle"""
+        for job in self.store.list(limit=None):
+            if job["status"] not in TERMINAL_STATES:
+                job["status"] = "interrupted"
+                job["finished_at"] = datetime.now().isoformat()
+                self.store.save(job)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                threads = int(os.environ.get("SOC_JOB_THREADS", DEFAULT_JOB_THREADS))
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_worker_init,
+                    initargs=(threads,)
+                )
+            return self._executor
+
+    def submit(self, kind, params=None):
+        """
+        Yeni iş oluştur ve kuyruğa gönder
+
+        Returns:
+            dict: İş kaydı
+        """
+        if kind not in JOB_TYPES:
+            raise ValueError(f"Bilinmeyen iş türü: {kind} (seçenekler: {list(JOB_TYPES)})")
+        job = self.store.create(kind, params or {})
+        future = self._get_executor().submit(_run_job, JOB_TYPES[kind], job["id"], self.store.jobs_dir, job["params"])
+        future.add_done_callback(lambda f, job_id=job["id"]: self._on_done(job_id, f))
+        logger.info(f"📥 İş kuyruğa alındı: {kind} [{job['id']}]")
+        return job
+
+    def _on_done(self, job_id, future):
+        error = future.exception()
+        if error is not None:
+            # Worker süreç çökerse (durumu yazamadan) kaydı burada kapat
+            job = self.store.get(job_id)
+            if job["status"] not in TERMINAL_STATES:
+                self.store.update(job_id, status="failed", error=str(error),
+                                  finished_at=datetime.now().isoformat())
+            logger.error(f"❌ İş başarısız [{job_id}]: {error}")
+            return
+        result = future.result() or {}
+        logger.info(f"✓ İş tamamlandı [{job_id}]")
+        if self.on_published and result.get("published"):
+            self.on_published(result["model_key"])
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def list(self, limit=50):
+        return self.store.list(limit)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -9,8 +9,19 @@ from sklearn.pipeline import Pipeline
 import joblib
 import json
 
+from drift import build_reference_distributions
+from profiling import stage, write_manifest
+
+# Sıkıştırma aşamasında kabul edilen en yüksek test RMSE'si (SOC yüzde puanı)
+COMPRESSION_RMSE_BUDGET = 1.0
+
 # Proje dizinini al
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROCESSED_DATA_PATH = os.path.join(BASE_DIR, "../data/processed/B0005_processed.csv")
+
+# Modelin kullandığı özellikler ve hedef değişken
+FEATURE_NAMES = ["voltage_mean", "current_mean", "temperature_mean", "time_max"]
+TARGET_NAME = "estimated_soc"
 
 def calculate_soc_from_voltage(voltage):
     """Voltaj değerlerinden SOC hesapla"""
@@ -56,15 +67,19 @@ def calculate_soc_from_voltage(voltage):
     
     return soc
 
-def load_and_fix_data():
-    """Mevcut işlenmiş veriyi yükle ve SOC'yi düzelt"""
-    processed_file_path = os.path.join(BASE_DIR, "../data/processed/B0005_processed.csv")
+def load_and_fix_data(data_path=None, compact=False):
+    """Mevcut işlenmiş veriyi yükle ve SOC'yi düzelt (compact: float32 / küçük tamsayı tipler)"""
+    processed_file_path = data_path or PROCESSED_DATA_PATH
     
     if not os.path.exists(processed_file_path):
         raise FileNotFoundError(f"İşlenmiş veri dosyası bulunamadı: {processed_file_path}")
     
     # İşlenmiş veriyi yükle
-    df = pd.read_csv(processed_file_path)
+    if compact:
+        from compact import read_compact_csv
+        df = read_compact_csv(processed_file_path)
+    else:
+        df = pd.read_csv(processed_file_path)
     print(f"✓ İşlenmiş veri yüklendi: {len(df)} satır")
     
     # Mevcut SOC değerlerini göster
@@ -82,6 +97,8 @@ def load_and_fix_data():
     # SOC'yi voltajdan YENİDEN HESAPLA
     print("\n🔧 SOC voltajdan yeniden hesaplanıyor...")
     df['estimated_soc'] = calculate_soc_from_voltage(df['voltage_mean'])
+    if compact:
+        df['estimated_soc'] = df['estimated_soc'].astype(np.float32)
     
     # Yeni SOC değerlerini göster
     print(f"\n✅ Yeni SOC istatistikleri:")
@@ -96,47 +113,68 @@ def load_and_fix_data():
     
     return df
 
-def train_model():
+def train_model(compress=False, rmse_budget=COMPRESSION_RMSE_BUDGET, model_dir=None,
+                data_path=None, n_jobs=-1, compact=False, progress=None):
     print("=== 🔋 Model Eğitimi Başlıyor ===")
+
+    # progress(oran, aşama): tamamlanan aşama oranı (ör. arka plan işi ilerlemesi)
+    steps = ["load_data", "split", "fit", "evaluate", "save_model"] + (["compress"] if compress else [])
+    def report(name):
+        if progress:
+            progress((steps.index(name) + 1) / len(steps), name)
     
     # Veriyi yükle ve SOC'yi düzelt
-    df = load_and_fix_data()
+    with stage("load_data"):
+        df = load_and_fix_data(data_path, compact=compact)
+    report("load_data")
     
     # Özellikler ve hedef değişken
-    X = df[["voltage_mean", "current_mean", "temperature_mean", "time_max"]]
-    y = df["estimated_soc"]
+    X = df[FEATURE_NAMES]
+    y = df[TARGET_NAME]
     
     # Veriyi böl
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, shuffle=True
-    )
+    with stage("split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, shuffle=True
+        )
+    report("split")
 
     print(f"\n📊 Veri boyutları:")
     print(f"Eğitim: {len(X_train)} örnek")
     print(f"Test: {len(X_test)} örnek")
 
+    # Kompakt modda aşama başına bellek (ağaçlar zaten float32 ile çalışır)
+    memory = None
+    if compact:
+        from compact import memory_report
+        memory = memory_report({"frame": df, "features": X, "train": X_train, "test": X_test})
+
     # Pipeline oluştur
     pipeline = Pipeline([
         ("imputer", SimpleImputer(strategy="mean")),
         ("model", RandomForestRegressor(
             n_estimators=100,
             random_state=42,
-            n_jobs=-1
+            n_jobs=n_jobs
         ))
     ])
 
     # Modeli eğit
     print("\n🎯 Model eğitiliyor...")
-    pipeline.fit(X_train, y_train)
+    with stage("fit"):
+        pipeline.fit(X_train, y_train)
+    report("fit")
 
-    # Tahminler
-    y_pred = pipeline.predict(X_test)
+    with stage("evaluate"):
+        # Tahminler
+        y_pred = pipeline.predict(X_test)
 
-    # Metrikler
-    mse = mean_squared_error(y_test, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y_test, y_pred)
-    mae = np.mean(np.abs(y_test - y_pred))
+        # Metrikler
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        r2 = r2_score(y_test, y_pred)
+        mae = np.mean(np.abs(y_test - y_pred))
+    report("evaluate")
 
     print(f"\n=== 📈 MODEL PERFORMANSI ===")
     print(f"Test MSE: {mse:.4f}")
@@ -152,11 +190,13 @@ def train_model():
         print(f"{feature}: {importance:.4f}")
 
     # Model kaydet
-    model_dir = os.path.join(BASE_DIR, "../models")
+    model_dir = model_dir or os.path.join(BASE_DIR, "../models")
     os.makedirs(model_dir, exist_ok=True)
 
     model_path = os.path.join(model_dir, "battery_soc_model.pkl")
-    joblib.dump(pipeline, model_path)
+    with stage("save_model"):
+        joblib.dump(pipeline, model_path)
+    report("save_model")
     print(f"\n💾 Model kaydedildi: {model_path}")
 
     # Model info
@@ -168,17 +208,40 @@ def train_model():
             "r2": round(r2, 4),
             "rmse": round(rmse, 4),
             "mae": round(mae, 4)
-        }
+        },
+        # API'deki kayma (drift) izleme için eğitim dağılımı
+        "reference_distributions": build_reference_distributions(X_train)
     }
+    if memory is not None:
+        model_info["memory"] = memory
+
+    # Gecikme bütçeli sıkıştırma: bütçeyi karşılayan en küçük model ayrı artifact olarak kaydedilir
+    if compress:
+        from compression import compress_model
+        with stage("compress"):
+            compressed, compression_report = compress_model(
+                pipeline, X_train, y_train, X_test, y_test, rmse_budget=rmse_budget, n_jobs=n_jobs
+            )
+        if compression_report["selected"] is not None:
+            compressed_path = os.path.join(model_dir, "battery_soc_model_compressed.pkl")
+            joblib.dump(compressed, compressed_path)
+            compression_report["artifact"] = os.path.basename(compressed_path)
+            print(f"💾 Sıkıştırılmış model kaydedildi: {compressed_path}")
+        model_info["compression"] = compression_report
+        report("compress")
 
     info_path = os.path.join(model_dir, "model_info.json")
     with open(info_path, "w") as f:
         json.dump(model_info, f, indent=4)
     print(f"📄 model_info.json oluşturuldu")
 
+    # SOC_PROFILE açıksa aşama süreleri / bellek model_info.json'ın yanına yazılır
+    write_manifest(model_dir, entrypoint="train_model", rows=len(df))
+
     print(f"\n✅ Eğitim tamamlandı!")
     print(f"📊 Final RMSE: {rmse:.2f}%")
     print(f"📊 Final R²: {r2:.4f}")
+    return model_info
 
 # model.py dosyasını AÇ ve EN SON kısmı şöyle değiştir:
 
@@ -188,7 +251,7 @@ if __name__ == "__main__":
     model_dir = os.path.join(BASE_DIR, "../models")
     
     # Eski dosyaları sil
-    for filename in ['battery_soc_model.pkl', 'model_info.json']:
+    for filename in ['battery_soc_model.pkl', 'battery_soc_model_compressed.pkl', 'model_info.json']:
         file_path = os.path.join(model_dir, filename)
         if os.path.exists(file_path):
             os.remove(file_path)
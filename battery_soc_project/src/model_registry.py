@@ -0,0 +1,270 @@
+"""
+Çoklu Model Kayıt Defteri (Registry)
+Kimya / hücre formatı gruplarına göre SOC modellerini ilk kullanımda yükler,
+bellek sınırlı LRU ile soğuk modelleri boşaltır
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+
+import joblib
+
+from drift import FeatureDriftMonitor
+from uncertainty import LeafValueTable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY = "default"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+MODEL_FILE = "battery_soc_model.pkl"
+INFO_FILE = "model_info.json"
+REGISTRY_FILE = "registry.json"
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def is_valid_key(key):
+    """Model anahtarı models/ altında tek bir klasör adı olarak güvenli mi"""
+    return bool(_KEY_PATTERN.match(key)) and key not in (".", "..")
+
+
+class ModelEntry:
+    """Yüklenmiş bir model ve ona bağlı yardımcı yapılar"""
+
+    def __init__(self, key, model, info, nbytes, load_seconds):
+        self.key = key
+        self.model = model
+        self.info = info
+        self.feature_names = info.get("feature_names", [])
+        self.nbytes = nbytes
+        self.load_seconds = load_seconds
+        self.loaded_at = datetime.now().isoformat()
+        self.hits = 0
+
+        # Referans dağılımı olmayan (eski) modellerde kayma izleme devre dışı
+        reference = info.get("reference_distributions")
+        self.drift_monitor = FeatureDriftMonitor(reference, self.feature_names) if reference else None
+
+        # Belirsizlik modu için ağaç başına yaprak değeri tablosu
+        try:
+            self.leaf_table = LeafValueTable(model)
+        except TypeError as e:
+            self.leaf_table = None
+            logger.warning(f"[{key}] Belirsizlik modu devre dışı: {e}")
+
+    def stats(self):
+        return {
+            "model_name": self.info.get("best_model_name", "Unknown"),
+            "memory_bytes": self.nbytes,
+            "load_seconds": round(self.load_seconds, 4),
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+        }
+
+
+class ModelRegistry:
+    """
+    Tembel yüklemeli, bellek sınırlı LRU model önbelleği
+
+    Model anahtarı `default` ise models/ kök klasöründeki artifact, aksi halde
+    models/<anahtar>/ altındaki artifact kullanılır. Batarya kimliğinden anahtar
+    türetmek için models/registry.json içindeki `battery_groups` eşlemesi okunur.
+    Aynı model için eşzamanlı ilk istekler tek bir yüklemeyi paylaşır.
+
+    Bellekten çıkarılan modelin kayma (drift) sayaçları saklanır ve aynı
+    referansla yeniden yüklendiğinde geri takılır. `pin` edilen modeller
+    (ör. gölge modun aday modeli) bellek sınırına sayılır ama çıkarılmaz.
+    """
+
+    def __init__(self, models_dir, max_bytes=DEFAULT_MAX_BYTES, variant=None):
+        self.models_dir = models_dir
+        self.max_bytes = max_bytes
+        self.variant = variant
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._generations = {}
+        self._drift_monitors = {}
+        self._pinned = set()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.battery_groups = {}
+        self.default_key = DEFAULT_KEY
+
+        registry_path = os.path.join(models_dir, REGISTRY_FILE)
+        if os.path.exists(registry_path):
+            with open(registry_path, "r") as f:
+                config = json.load(f)
+            self.battery_groups = config.get("battery_groups", {})
+            self.default_key = config.get("default_key", DEFAULT_KEY)
+
+    def resolve_key(self, model_key=None, battery_id=None):
+        """
+        İstekteki model anahtarını veya batarya kimliğini model anahtarına çevir
+
+        Returns:
+            str: Model anahtarı
+        """
+        if model_key:
+            return str(model_key)
+        if battery_id is not None:
+            return self.battery_groups.get(str(battery_id), self.default_key)
+        return self.default_key
+
+    def _paths(self, key):
+        if not is_valid_key(key):
+            raise KeyError(f"Geçersiz model anahtarı: {key}")
+        base = self.models_dir if key == DEFAULT_KEY else os.path.join(self.models_dir, key)
+        model_path = os.path.join(base, MODEL_FILE)
+        info_path = os.path.join(base, INFO_FILE)
+        if not os.path.exists(model_path) or not os.path.exists(info_path):
+            raise KeyError(f"Model bulunamadı: {key}")
+        return base, model_path, info_path
+
+    def available(self):
+        """Diskte bulunan model anahtarları"""
+        if not os.path.isdir(self.models_dir):
+            return []
+        keys = []
+        for key in [DEFAULT_KEY] + sorted(os.listdir(self.models_dir)):
+            try:
+                self._paths(key)
+                keys.append(key)
+            except KeyError:
+                continue
+        return keys
+
+    def _load(self, key):
+        base, model_path, info_path = self._paths(key)
+        start = time.perf_counter()
+        with open(info_path, "r") as f:
+            info = json.load(f)
+
+        # variant=compressed: eğitimde seçilen sıkıştırılmış modeli sun
+        compressed = (info.get("compression") or {}).get("artifact")
+        if self.variant == "compressed" and compressed:
+            model_path = os.path.join(base, compressed)
+        model = joblib.load(model_path)
+
+        # Bellek tahmini: serileştirilmiş artifact boyutu (ağaç dizileri baskındır)
+        nbytes = os.path.getsize(model_path)
+        entry = ModelEntry(key, model, info, nbytes, 0.0)
+        if entry.leaf_table is not None:
+            entry.nbytes += entry.leaf_table.values.nbytes
+        entry.load_seconds = time.perf_counter() - start
+        logger.info(f"✓ Model yüklendi [{key}]: {info.get('best_model_name')} "
+                    f"({entry.nbytes/1024:.0f} KB, {entry.load_seconds*1000:.0f} ms)")
+        return entry
+
+    def get(self, key):
+        """
+        Modeli döndür; yüklü değilse yükle (eşzamanlı çağrılar tek yüklemeyi bekler)
+
+        Raises:
+            KeyError: Model bulunamazsa
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                return entry
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[key] = future
+                generation = self._generations.get(key, 0)
+
+        if not owner:
+            return future.result()
+
+        try:
+            entry = self._load(key)
+        except BaseException as e:
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            entry.hits += 1
+            if self._loading.get(key) is future:
+                del self._loading[key]
+            # Yükleme sürerken invalidate edildiyse eski artifact önbelleğe yazılmaz
+            if self._generations.get(key, 0) == generation:
+                self._restore_drift(entry)
+                self._entries[key] = entry
+                self._evict()
+        future.set_result(entry)
+        return entry
+
+    def _restore_drift(self, entry):
+        """Bellekten çıkarılmadan önceki kayma sayaçlarını aynı referanslı modele geri tak"""
+        saved = self._drift_monitors.pop(entry.key, None)
+        if saved is not None and entry.drift_monitor is not None:
+            monitor, reference = saved
+            if reference == entry.info.get("reference_distributions"):
+                entry.drift_monitor = monitor
+
+    def peek(self, key):
+        """Modeli yüklemeden (varsa) döndür"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def _evict(self):
+        """Bellek sınırı aşılırsa en uzun süredir kullanılmayan modelleri boşalt (son eklenen ve pin'liler hariç)"""
+        total = sum(e.nbytes for e in self._entries.values())
+        candidates = [k for k in list(self._entries)[:-1] if k not in self._pinned]
+        for key in candidates:
+            if total <= self.max_bytes:
+                break
+            entry = self._entries.pop(key)
+            total -= entry.nbytes
+            self.evictions += 1
+            if entry.drift_monitor is not None:
+                self._drift_monitors[key] = (entry.drift_monitor, entry.info.get("reference_distributions"))
+            logger.info(f"♻️  Model bellekten çıkarıldı [{key}] ({entry.nbytes/1024:.0f} KB)")
+
+    def pin(self, key):
+        """Modeli LRU'dan muaf tut; bellek sınırına sayılmaya devam eder"""
+        with self._lock:
+            self._pinned.add(key)
+
+    def unpin(self, key):
+        with self._lock:
+            self._pinned.discard(key)
+            self._evict()
+
+    def invalidate(self, key):
+        """Modeli önbellekten çıkar (bir sonraki istekte diskten yeniden yüklenir)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._drift_monitors.pop(key, None)
+            # Süren yükleme tamamlandığında eski modeli önbelleğe geri yazmasın
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._loading.pop(key, None)
+
+    def stats(self):
+        """Model başına bellek / yükleme istatistikleri"""
+        with self._lock:
+            loaded = {key: entry.stats() for key, entry in self._entries.items()}
+            loading = list(self._loading)
+            pinned = sorted(self._pinned)
+        return {
+            "loaded": loaded,
+            "loading": loading,
+            "available": self.available(),
+            "memory_bytes": sum(s["memory_bytes"] for s in loaded.values()),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "pinned": pinned,
+            "default_key": self.default_key,
+            "battery_groups": self.battery_groups,
+        }
@@ -0,0 +1,304 @@
+"""
+Bellek Dışı (Out-of-Core) Model Eğitimi
+İşlenmiş veriyi parçalar halinde okur, her parça için paralel worker'larda
+alt-orman eğitir ve bunları tek bir sunulabilir ormanda birleştirir
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline
+
+from drift import build_reference_distributions
+from model import BASE_DIR, FEATURE_NAMES, PROCESSED_DATA_PATH, calculate_soc_from_voltage
+from profiling import stage, worker_init, write_manifest
+from streaming_stats import StreamingStats
+
+DEFAULT_CHUNKSIZE = 50000
+DEFAULT_MAX_TREES = 100  # birleşik ormandaki toplam ağaç bütçesi
+DEFAULT_MAX_DEPTH = 16
+DEFAULT_MIN_SAMPLES_LEAF = 5
+SAMPLE_SIZE = 50000
+
+
+class RowReservoir:
+    """Akıştan sabit boyutlu, orantılı rastgele satır örneklemi"""
+
+    def __init__(self, size=SAMPLE_SIZE, n_features=len(FEATURE_NAMES), seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.X = np.empty((0, n_features))
+        self.y = np.empty(0)
+        self.seen = 0
+
+    def add(self, X, y):
+        n = len(X)
+        if n == 0:
+            return
+        if len(self.X) + n <= self.size:
+            self.X = np.vstack([self.X, X])
+            self.y = np.concatenate([self.y, y])
+        else:
+            # Mevcut örneklem `seen` satırı, yeni parça `n` satırı temsil eder
+            take_old = min(self.rng.binomial(self.size, self.seen / (self.seen + n)), len(self.X))
+            take_new = min(self.size - take_old, n)
+            old = self.rng.choice(len(self.X), take_old, replace=False)
+            new = self.rng.choice(n, take_new, replace=False)
+            self.X = np.vstack([self.X[old], X[new]])
+            self.y = np.concatenate([self.y[old], y[new]])
+        self.seen += n
+
+
+class TreeReservoir:
+    """
+    Alt-orman ağaçlarından en fazla `size` ağaçlık düzgün örneklem
+
+    Parça sayısı ağaç bütçesini aşsa bile birleşik orman (ve sunum
+    gecikmesi / belleği) veri boyutuyla büyümez.
+    """
+
+    def __init__(self, size=DEFAULT_MAX_TREES, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.trees = []
+        self.template = None
+        self.seen = 0
+
+    def add(self, forest):
+        if self.template is None:
+            self.template = forest
+        for tree in forest.estimators_:
+            if len(self.trees) < self.size:
+                self.trees.append(tree)
+            else:
+                j = self.rng.integers(self.seen + 1)
+                if j < self.size:
+                    self.trees[j] = tree
+            self.seen += 1
+
+
+def _holdout_mask(row_index, test_fraction, seed=42):
+    """Satır indeksinin özetine göre belirlenimci test ayrımı (parça sınırlarından bağımsız)"""
+    h = (row_index.astype(np.uint64) * np.uint64(2654435761) + np.uint64(seed)) % np.uint64(2**32)
+    return h.astype(np.float64) / 2**32 < test_fraction
+
+
+def _prepare_chunk(chunk):
+    """Parçadan özellik matrisi ve voltajdan yeniden hesaplanan SOC hedefini çıkar"""
+    X = chunk[FEATURE_NAMES].to_numpy(dtype=float)
+    y = np.asarray(calculate_soc_from_voltage(chunk['voltage_mean']), dtype=float)
+    return X, y
+
+
+def _fit_sub_forest(X, y, n_estimators, max_depth, min_samples_leaf, random_state):
+    """Worker süreçte tek parça için alt-orman eğit"""
+    forest = RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        random_state=random_state,
+        n_jobs=1
+    )
+    return forest.fit(X, y)
+
+
+def merge_forests(forests, n_jobs=-1, trees=None):
+    """
+    Alt-ormanların ağaçlarını yeni bir RandomForestRegressor'da birleştir
+
+    Orman tahmini ağaç ortalaması olduğundan birleşik orman, parça başına
+    ormanların ağaç sayısıyla ağırlıklı ortalamasına eşittir. Girdi ormanları
+    değiştirilmez; öğrenilmiş öznitelikler (n_features_in_, estimator_ ...)
+    ilk ormandan kopyalanır.
+
+    Args:
+        forests (list): Eğitilmiş alt-ormanlar
+        n_jobs (int): Birleşik ormanın tahminde kullandığı çekirdek sayısı
+        trees (list): Birleştirilecek ağaçlar (varsayılan: tüm ormanların ağaçları)
+    """
+    first = forests[0]
+    trees = list(trees) if trees is not None else [t for forest in forests for t in forest.estimators_]
+    merged = clone(first).set_params(n_estimators=len(trees), n_jobs=n_jobs)
+    for attr, value in vars(first).items():
+        if attr.endswith("_") and not attr.startswith("_") and attr != "estimators_":
+            setattr(merged, attr, value)
+    merged.estimators_ = trees
+    return merged
+
+
+def train_out_of_core(file_path=PROCESSED_DATA_PATH, chunksize=DEFAULT_CHUNKSIZE,
+                      max_trees=DEFAULT_MAX_TREES, trees_per_chunk=None, max_depth=DEFAULT_MAX_DEPTH,
+                      min_samples_leaf=DEFAULT_MIN_SAMPLES_LEAF, max_workers=None,
+                      test_fraction=0.2, sample_size=SAMPLE_SIZE, model_dir=None, random_state=42,
+                      n_jobs=-1, progress=None):
+    """
+    Veri setini belleğe almadan parça parça eğit
+
+    1. geçiş: akış istatistikleriyle imputer ortalamaları.
+    2. geçiş: her parçanın eğitim satırları bir worker'da alt-ormana dönüşür;
+    aynı anda en fazla 2 x max_workers parça bekler. Test satırları ve drift
+    referansı için satırlar sabit boyutlu rezervuarlarda tutulur. Ağaç sayısı
+    max_trees bütçesiyle, ağaç boyutu derinlik / yaprak sınırlarıyla
+    sınırlandığından tepe bellek ve birleşik orman boyutu veri seti boyutuna
+    değil chunksize'a ve bütçeye bağlıdır.
+
+    Args:
+        file_path (str): İşlenmiş CSV dosya yolu
+        chunksize (int): Parça başına satır sayısı
+        max_trees (int): Birleşik ormandaki toplam ağaç sayısı üst sınırı
+        trees_per_chunk (int): Parça başına ağaç sayısı (None: max_trees / parça sayısı)
+        max_depth (int): Ağaç derinlik sınırı
+        min_samples_leaf (int): Yapraktaki en az örnek sayısı
+        max_workers (int): Worker süreç sayısı (None: CPU sayısı)
+        test_fraction (float): Test için ayrılan satır oranı
+        sample_size (int): Test / referans rezervuar boyutu
+        model_dir (str): Artifact klasörü (varsayılan ../models)
+        random_state (int): Tohum
+        n_jobs (int): Birleşik ormanın değerlendirme / tahminde kullandığı çekirdek sayısı
+        progress (callable): progress(oran, aşama) ilerleme geri çağrısı (opsiyonel)
+
+    Returns:
+        dict: model_info
+    """
+    print("=== 🔋 Bellek Dışı Model Eğitimi Başlıyor ===")
+    report = progress or (lambda fraction, name: None)
+    max_workers = max_workers or os.cpu_count() or 1
+    model_dir = model_dir or os.path.join(BASE_DIR, "../models")
+
+    # 1. geçiş: imputer için akış ortalamaları
+    stats = StreamingStats(FEATURE_NAMES, reservoir_size=1)
+    with stage("pass1_stats"):
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, usecols=FEATURE_NAMES):
+            stats.update(chunk)
+    means = np.diag(stats.mean)
+    print(f"✓ 1. geçiş: {stats.rows} satır, özellik ortalamaları hesaplandı")
+    report(0.1, "pass1_stats")
+    expected_chunks = max(1, -(-stats.rows // chunksize))
+    if trees_per_chunk is None:
+        trees_per_chunk = max(1, max_trees // expected_chunks)
+
+    # Tek satırlık ortalama çerçevesine uydurulan imputer, akış ortalamalarını aynen öğrenir
+    imputer = SimpleImputer(strategy="mean").fit(pd.DataFrame([means], columns=FEATURE_NAMES))
+
+    # 2. geçiş: paralel alt-orman eğitimi
+    holdout = RowReservoir(sample_size, seed=random_state)
+    train_sample = RowReservoir(sample_size, seed=random_state + 1)
+    reservoir = TreeReservoir(max_trees, seed=random_state)
+    n_fitted, pending = 0, set()
+    n_chunks, n_train, offset = 0, 0, 0
+
+    with stage("pass2_fit"), ProcessPoolExecutor(max_workers=max_workers, initializer=worker_init) as executor:
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, usecols=FEATURE_NAMES):
+            X, y = _prepare_chunk(chunk)
+            X = imputer.transform(pd.DataFrame(X, columns=FEATURE_NAMES))
+            is_test = _holdout_mask(np.arange(offset, offset + len(X)), test_fraction, random_state)
+            offset += len(X)
+
+            holdout.add(X[is_test], y[is_test])
+            X_train, y_train = X[~is_test], y[~is_test]
+            train_sample.add(X_train, y_train)
+            if len(X_train) == 0:
+                continue
+
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    reservoir.add(f.result())
+                n_fitted += len(done)
+                report(0.1 + 0.8 * n_fitted / expected_chunks, "pass2_fit")
+            pending.add(executor.submit(_fit_sub_forest, X_train, y_train, trees_per_chunk,
+                                        max_depth, min_samples_leaf, random_state + n_chunks))
+            n_chunks += 1
+            n_train += len(X_train)
+
+        for f in wait(pending).done:
+            reservoir.add(f.result())
+    report(0.9, "pass2_fit")
+
+    if reservoir.template is None:
+        raise ValueError(f"Eğitim verisi bulunamadı: {file_path}")
+
+    forest = merge_forests([reservoir.template], n_jobs=n_jobs, trees=reservoir.trees)
+    pipeline = Pipeline([("imputer", imputer), ("model", forest)])
+    print(f"✓ 2. geçiş: {n_chunks} parça, {n_train} eğitim satırı, "
+          f"{forest.n_estimators}/{reservoir.seen} ağaç")
+
+    # Test rezervuarı üzerinde değerlendirme (imputer zaten uygulanmış)
+    X_test = pd.DataFrame(holdout.X, columns=FEATURE_NAMES)
+    with stage("evaluate"):
+        y_pred = pipeline.predict(X_test)
+    rmse = float(np.sqrt(mean_squared_error(holdout.y, y_pred)))
+    r2 = float(r2_score(holdout.y, y_pred))
+    mae = float(np.mean(np.abs(holdout.y - y_pred)))
+    report(0.95, "evaluate")
+
+    print(f"\n=== 📈 MODEL PERFORMANSI ({len(holdout.y)} test satırı) ===")
+    print(f"Test RMSE: {rmse:.4f}")
+    print(f"Test MAE: {mae:.4f}")
+    print(f"Test R² : {r2:.4f}")
+
+    os.makedirs(model_dir, exist_ok=True)
+    model_path = os.path.join(model_dir, "battery_soc_model.pkl")
+    with stage("save_model"):
+        joblib.dump(pipeline, model_path)
+    print(f"\n💾 Model kaydedildi: {model_path}")
+
+    model_info = {
+        "best_model_name": "RandomForest",
+        "feature_names": FEATURE_NAMES,
+        "feature_importances": dict(zip(FEATURE_NAMES, [float(i) for i in forest.feature_importances_])),
+        "metrics": {
+            "r2": round(r2, 4),
+            "rmse": round(rmse, 4),
+            "mae": round(mae, 4)
+        },
+        # API'deki kayma (drift) izleme için eğitim dağılımı (rezervuar örneklemi)
+        "reference_distributions": build_reference_distributions(
+            pd.DataFrame(train_sample.X, columns=FEATURE_NAMES)
+        ),
+        "training": {
+            "mode": "out_of_core",
+            "chunksize": chunksize,
+            "chunks": n_chunks,
+            "trees_per_chunk": trees_per_chunk,
+            "max_trees": max_trees,
+            "trees_trained": reservoir.seen,
+            "max_depth": max_depth,
+            "min_samples_leaf": min_samples_leaf,
+            "train_rows": n_train,
+            "holdout_rows_evaluated": int(len(holdout.y)),
+        }
+    }
+    info_path = os.path.join(model_dir, "model_info.json")
+    with open(info_path, "w") as f:
+        json.dump(model_info, f, indent=4)
+    print(f"📄 model_info.json oluşturuldu")
+    write_manifest(model_dir, entrypoint="train_out_of_core", rows=offset)
+    report(1.0, "save_model")
+    return model_info
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bellek dışı (parçalı) model eğitimi")
+    parser.add_argument("--data", default=PROCESSED_DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--max-trees", type=int, default=DEFAULT_MAX_TREES)
+    parser.add_argument("--trees-per-chunk", type=int, default=None)
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument("--min-samples-leaf", type=int, default=DEFAULT_MIN_SAMPLES_LEAF)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    train_out_of_core(args.data, chunksize=args.chunksize, max_trees=args.max_trees,
+                      trees_per_chunk=args.trees_per_chunk, max_depth=args.max_depth,
+                      min_samples_leaf=args.min_samples_leaf, max_workers=args.workers)
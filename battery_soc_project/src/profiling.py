@@ -0,0 +1,276 @@
+"""
+Çalışma Profili (Run Profiler)
+Aşama başına süre ve bellek ölçümü; isteğe bağlı tracemalloc / cProfile.
+SOC_PROFILE ortam değişkeniyle açılır, kapalıyken aşamalar boş bağlam yöneticisidir
+
+SOC_PROFILE değerleri (virgülle birleştirilebilir):
+    1 / time  : aşama süreleri ve tepe RSS
+    memory    : + tracemalloc ile aşama başına Python bellek tepe değeri
+    cprofile  : + tüm çalışma için cProfile (run_profile.prof + en pahalı fonksiyonlar)
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_MODES = ("time", "memory", "cprofile")
+MANIFEST_FILE = "run_manifest.json"
+PROFILE_FILE = "run_profile.prof"
+TOP_FUNCTIONS = 15
+
+_NULL_STAGE = nullcontext()
+
+
+def parse_modes(value):
+    """
+    'memory,cprofile' biçimindeki mod listesini doğrula
+
+    Raises:
+        ValueError: Bilinmeyen mod varsa
+    """
+    modes = {m.strip().lower() for m in value.split(",") if m.strip()}
+    unknown = sorted(modes - set(PROFILE_MODES))
+    if unknown or not modes:
+        raise ValueError(f"Geçersiz profil modu: {value!r} (seçenekler: {', '.join(PROFILE_MODES)})")
+    return modes
+
+
+def _peak_rss_mb():
+    """Sürecin tepe bellek kullanımı (MB); Linux'ta KB, macOS'ta byte döner"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class _Frame:
+    def __init__(self, path):
+        self.path = path
+        self.start = time.perf_counter()
+        self.traced_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self.traced_peak = 0
+
+
+class RunProfiler:
+    """
+    Aşama ölçümlerini toplayan çalışma profili
+
+    İç içe aşamalar 'dış/iç' yoluyla adlandırılır; aynı yol tekrar çalışırsa
+    (ör. çevrim başına çıkarım) çağrı sayısı, toplam ve en uzun süre birleştirilir.
+    Ölçüm ilk aşamada başlar. Aşama içinde fork ile açılan worker süreçler
+    açık tracemalloc / cProfile durumunu devralır; havuzlar bu yüzden
+    `worker_init` ile başlatılmalıdır.
+    """
+
+    def __init__(self, modes=()):
+        self.modes = set(modes)
+        self.enabled = bool(self.modes)
+        self.stages = {}
+        self._stack = []
+        self._profile = None
+        self.started_at = None
+        self._start = None
+
+    @classmethod
+    def from_env(cls, value=None):
+        value = os.environ.get("SOC_PROFILE", "") if value is None else value
+        modes = {m.strip().lower() for m in value.split(",") if m.strip()}
+        modes.discard("0")
+        if modes & {"1", "true", "on"}:
+            modes = (modes - {"1", "true", "on"}) | {"time"}
+        return cls(modes | {"time"} if modes else ())
+
+    def start(self):
+        """Ölçümleri sıfırla ve çalışmayı başlat"""
+        self.stages = {}
+        self._stack = []
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        if "memory" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if "cprofile" in self.modes:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    @contextmanager
+    def stage(self, name):
+        """Aşamanın süresini ve belleğini ölç"""
+        if self._start is None:
+            self.start()
+        parent = self._stack[-1] if self._stack else None
+        tracing = tracemalloc.is_tracing()
+        if tracing and parent is not None:
+            # Üst aşamanın o ana kadarki tepe değeri, sıfırlamadan önce saklanır
+            parent.traced_peak = max(parent.traced_peak, tracemalloc.get_traced_memory()[1])
+        if tracing:
+            tracemalloc.reset_peak()
+        frame = _Frame(f"{parent.path}/{name}" if parent else name)
+        # Manifestte aşamalar ilk giriş sırasıyla listelenir
+        self.stages.setdefault(frame.path, {"stage": frame.path, "calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self._record(frame, parent, tracing)
+
+    def _record(self, frame, parent, tracing):
+        seconds = time.perf_counter() - frame.start
+        stats = self.stages[frame.path]
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["peak_rss_mb"] = _peak_rss_mb()
+
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            frame.traced_peak = max(frame.traced_peak, peak)
+            stats["traced_peak_mb"] = round(max(stats.get("traced_peak_mb", 0.0), frame.traced_peak / 2**20), 3)
+            stats["traced_delta_mb"] = round(stats.get("traced_delta_mb", 0.0)
+                                             + (current - frame.traced_start) / 2**20, 3)
+            if parent is not None:
+                parent.traced_peak = max(parent.traced_peak, frame.traced_peak)
+            tracemalloc.reset_peak()
+
+    def record(self, name, seconds):
+        """Başka bir süreçte ölçülmüş süreyi (ör. worker'da figür çizimi) aktif aşamanın altına ekle"""
+        if self._start is None:
+            self.start()
+        parent = self._stack[-1] if self._stack else None
+        path = f"{parent.path}/{name}" if parent else name
+        stats = self.stages.setdefault(path, {"stage": path, "calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def _top_functions(self, output_dir):
+        self._profile.disable()
+        self._profile.dump_stats(os.path.join(output_dir, PROFILE_FILE))
+        buffer = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=buffer)
+        top = []
+        for func, (_, ncalls, _, cumulative, _) in sorted(stats.stats.items(), key=lambda kv: -kv[1][3])[:TOP_FUNCTIONS]:
+            filename, line, name = func
+            top.append({"function": f"{os.path.basename(filename)}:{line}({name})",
+                        "calls": ncalls, "cumulative_seconds": round(cumulative, 4)})
+        self._profile.enable()
+        return top
+
+    def manifest(self, output_dir=None, **extra):
+        """Çalışma özetini dict olarak döndür"""
+        stages = []
+        for stats in self.stages.values():
+            if not stats["calls"]:
+                continue  # henüz bitmemiş aşama
+            row = dict(stats)
+            row["seconds"] = round(row["seconds"], 4)
+            row["max_seconds"] = round(row["max_seconds"], 4)
+            row["mean_ms"] = round(stats["seconds"] / stats["calls"] * 1000, 3)
+            stages.append(row)
+        manifest = {
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(),
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "modes": sorted(self.modes),
+            "peak_rss_mb": _peak_rss_mb(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "argv": sys.argv,
+            **extra,
+            "stages": stages,
+        }
+        if self._profile is not None and output_dir is not None:
+            manifest["cprofile_top"] = self._top_functions(output_dir)
+            manifest["cprofile_file"] = PROFILE_FILE
+        return manifest
+
+    def write_manifest(self, output_dir, **extra):
+        """
+        run_manifest.json dosyasını yaz
+
+        Returns:
+            str: Manifest yolu (profil kapalıysa veya hiç aşama ölçülmediyse None)
+        """
+        if not self.enabled or self._start is None:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, MANIFEST_FILE)
+        with open(path, "w") as f:
+            json.dump(self.manifest(output_dir, **extra), f, indent=4)
+        print(f"⏱️  Çalışma profili kaydedildi: {path}")
+
+        # Aynı süreçteki sonraki çalışma (ör. iş kuyruğu worker'ı) sıfırdan başlar
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = None
+        self._start = None
+        return path
+
+
+PROFILER = RunProfiler.from_env()
+
+
+def enable(modes="time"):
+    """Profili çalışma anında aç (ör. CLI --profile); önceki ölçümler sıfırlanır"""
+    global PROFILER
+    PROFILER = RunProfiler.from_env(modes)
+    return PROFILER
+
+
+def worker_init():
+    """
+    Süreç havuzu başlatıcısı: fork ile devralınan profili kapat
+
+    Worker'ların ölçümleri ana sürece aktarılmadığından tracemalloc ve
+    cProfile worker'da yalnızca yavaşlatır.
+    """
+    global PROFILER
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    sys.setprofile(None)
+    PROFILER = RunProfiler()
+
+
+def stage(name):
+    """Aşama bağlam yöneticisi; profil kapalıyken maliyetsiz"""
+    if not PROFILER.enabled:
+        return _NULL_STAGE
+    return PROFILER.stage(name)
+
+
+def record(name, seconds):
+    """Dışarıda ölçülmüş aşama süresini ekle; profil kapalıyken hiçbir şey yapmaz"""
+    if PROFILER.enabled:
+        PROFILER.record(name, seconds)
+
+
+def profiled(name=None):
+    """Fonksiyonu aşama olarak ölçen decorator"""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_manifest(output_dir, **extra):
+    """Etkin profilin manifestini yaz (profil kapalıysa hiçbir şey yapmaz)"""
+    return PROFILER.write_manifest(output_dir, **extra)
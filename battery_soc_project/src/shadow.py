@@ -0,0 +1,200 @@
+"""
+Gölge (Shadow) Model Değerlendirmesi
+Aday model, birincil modelin skorladığı özellik matrislerini istek yolunun
+dışında, arka plan iş parçacıklarında skorlar; tahmin farkı ve gecikme
+istatistikleri sabit bellekte tutulur
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_PENDING = 64
+DEFAULT_WINDOW = 1000
+DEFAULT_TOLERANCE = 1.0  # SOC yüzde puanı
+
+
+class RunningStats:
+    """Welford / Chan birleştirmesiyle toplu güncellenen ortalama ve varyans"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def summary(self):
+        if self.n == 0:
+            return {"count": 0}
+        return {
+            "count": self.n,
+            "mean": round(float(self.mean), 6),
+            "std": round(float(np.sqrt(self.m2 / self.n)), 6),
+            "min": round(self.min, 6),
+            "max": round(self.max, 6),
+        }
+
+
+class LatencyWindow:
+    """Son `size` ölçümü tutan halka tampon (ms cinsinden yüzdelikler)"""
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.values = np.zeros(size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.values[self.count % len(self.values)] = seconds
+        self.count += 1
+
+    def summary(self):
+        window = self.values[:min(self.count, len(self.values))] * 1000
+        if len(window) == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(window, [50, 95, 99])
+        return {
+            "count": self.count,
+            "window": len(window),
+            "mean_ms": round(float(window.mean()), 4),
+            "p50_ms": round(float(p50), 4),
+            "p95_ms": round(float(p95), 4),
+            "p99_ms": round(float(p99), 4),
+        }
+
+
+class ShadowScorer:
+    """
+    Aday modeli birincil trafikte yanıtları etkilemeden çalıştır
+
+    `submit` istek yolunda yalnızca sayaç günceller ve işi kuyruğa bırakır;
+    bekleyen iş sayısı `max_pending`'i aşarsa parti atlanır (dropped), böylece
+    aday model yavaş olsa bile bellek ve birincil gecikme sınırlı kalır.
+    `submit` hiçbir zaman istisna fırlatmaz: kapatılmış skorlayıcıya gelen
+    parti de atlanmış sayılır.
+    """
+
+    def __init__(self, candidate, primary_key, max_workers=DEFAULT_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, tolerance=DEFAULT_TOLERANCE, window=DEFAULT_WINDOW):
+        self.candidate = candidate
+        self.primary_key = primary_key
+        self.max_pending = max_pending
+        self.tolerance = tolerance
+        self.window = window
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soc-shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.reset()
+
+    def reset(self):
+        """İstatistikleri sıfırla"""
+        with self._lock:
+            self.diff = RunningStats()
+            self.abs_diff = RunningStats()
+            self.within_tolerance = 0
+            self.primary_latency = LatencyWindow(self.window)
+            self.candidate_latency = LatencyWindow(self.window)
+            self.submitted = 0
+            self.dropped = 0
+            self.errors = 0
+            self.last_error = None
+            self.started_at = time.time()
+
+    def submit(self, features_array, primary_predictions, primary_seconds):
+        """
+        Birincil modelin skorladığı partiyi aday modele gönder (bloklamaz)
+
+        Returns:
+            bool: Parti kuyruğa alındıysa True, atlandıysa False
+        """
+        with self._lock:
+            self.primary_latency.add(primary_seconds)
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            self.submitted += 1
+        try:
+            self._executor.submit(self._score, features_array, primary_predictions)
+        except Exception:
+            # Ör. skorlayıcı değiştirilirken kapatıldı; birincil yanıt etkilenmez
+            with self._lock:
+                self._pending -= 1
+                self.submitted -= 1
+                self.dropped += 1
+            return False
+        return True
+
+    def _score(self, features_array, primary_predictions):
+        try:
+            start = time.perf_counter()
+            candidate_predictions = self.candidate.model.predict(features_array)
+            elapsed = time.perf_counter() - start
+            # API yanıtı gibi 0-100 aralığına kırpılmış değerler karşılaştırılır
+            diff = (np.clip(np.asarray(candidate_predictions, dtype=float), 0, 100)
+                    - np.clip(np.asarray(primary_predictions, dtype=float), 0, 100))
+            abs_diff = np.abs(diff)
+            with self._lock:
+                self.candidate_latency.add(elapsed)
+                self.diff.update(diff)
+                self.abs_diff.update(abs_diff)
+                self.within_tolerance += int((abs_diff <= self.tolerance).sum())
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = str(e)
+            logger.warning(f"Gölge model hatası [{self.candidate.key}]: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        """Tahmin farkı ve model başına gecikme özeti"""
+        with self._lock:
+            rows = self.diff.n
+            return {
+                "primary_key": self.primary_key,
+                "candidate_key": self.candidate.key,
+                "candidate_model_name": self.candidate.info.get("best_model_name", "Unknown"),
+                "candidate_metrics": self.candidate.info.get("metrics", {}),
+                "rows_compared": rows,
+                "difference": self.diff.summary(),
+                "abs_difference": self.abs_diff.summary(),
+                "tolerance": self.tolerance,
+                "within_tolerance_rate": round(self.within_tolerance / rows, 4) if rows else None,
+                "latency": {
+                    "primary": self.primary_latency.summary(),
+                    "candidate": self.candidate_latency.summary(),
+                },
+                "batches": {
+                    "submitted": self.submitted,
+                    "dropped": self.dropped,
+                    "pending": self._pending,
+                    "errors": self.errors,
+                    "last_error": self.last_error,
+                },
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
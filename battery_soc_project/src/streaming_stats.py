@@ -0,0 +1,241 @@
+"""
+Akış (Streaming) İstatistik Motoru
+Belleğe sığmayan işlenmiş veriler için tek geçişli, birleştirilebilir
+moment / ko-moment (Welford-Chan) biriktiricisi
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from profiling import worker_init
+
+RESERVOIR_SIZE = 10000
+
+
+class StreamingStats:
+    """
+    Birleştirilebilir sütun istatistikleri
+
+    Her (i, j) sütun çifti için yalnızca ikisinin de dolu olduğu satırlar
+    üzerinden sayı, ortalama, kare toplamı (M2) ve ko-moment tutulur; bu
+    sayede sonuç pandas'ın çift bazlı (pairwise) `corr()` davranışıyla aynıdır.
+    Yüzdelikler sabit boyutlu bir rezervuar örnekleminden hesaplanır
+    (veri rezervuardan küçükse kesin sonuç verir).
+    """
+
+    def __init__(self, columns=None, reservoir_size=RESERVOIR_SIZE, seed=42):
+        self.columns = list(columns) if columns is not None else None
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.n = None        # (p, p) çift bazlı gözlem sayısı
+        self.mean = None     # (p, p) mean[i, j]: i sütununun (i, j) dolu satırlardaki ortalaması
+        self.m2 = None       # (p, p) m2[i, j]: i sütununun (i, j) dolu satırlardaki kare sapma toplamı
+        self.comoment = None # (p, p) ko-moment
+        self.min = None
+        self.max = None
+        self.missing = None
+        self.reservoir = None
+
+    def _init_arrays(self, p):
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+        self.min = np.full(p, np.inf)
+        self.max = np.full(p, -np.inf)
+        self.missing = np.zeros(p, dtype=np.int64)
+        self.reservoir = np.empty((0, p))
+
+    def update(self, chunk):
+        """
+        Bir veri parçasını (chunk) biriktiriciye ekle
+
+        Args:
+            chunk (DataFrame): Veri parçası
+
+        Returns:
+            StreamingStats: self
+        """
+        if self.columns is None:
+            self.columns = list(chunk.select_dtypes(include=[np.number]).columns)
+        values = chunk[self.columns].to_numpy(dtype=float)
+        return self.merge(self._from_array(values))
+
+    def _from_array(self, values):
+        """Tek bir parçanın istatistiklerini vektörel olarak hesapla"""
+        part = StreamingStats(self.columns, self.reservoir_size)
+        p = values.shape[1]
+        part._init_arrays(p)
+        if len(values) == 0:
+            return part
+
+        mask = ~np.isnan(values)
+        m = mask.astype(float)
+
+        # Sayısal kararlılık için parça ortalamasına göre kaydır (kovaryans kaydırmadan bağımsızdır)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            shift = np.nan_to_num(np.nanmean(values, axis=0))
+        centered = np.where(mask, values - shift, 0.0)
+
+        n = m.T @ m
+        sums = centered.T @ m                       # sums[i, j] = Σ x_i  (i ve j dolu)
+        sq_sums = (centered ** 2).T @ m             # Σ x_i²
+        cross = centered.T @ centered               # Σ x_i x_j
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_c = np.where(n > 0, sums / n, 0.0)
+        part.n = n
+        part.mean = mean_c + shift[:, None]
+        part.m2 = sq_sums - n * mean_c ** 2
+        part.comoment = cross - n * mean_c * mean_c.T
+
+        part.rows = len(values)
+        part.missing = (~mask).sum(axis=0)
+        part.min = np.where(mask.any(axis=0), np.nanmin(np.where(mask, values, np.inf), axis=0), np.inf)
+        part.max = np.where(mask.any(axis=0), np.nanmax(np.where(mask, values, -np.inf), axis=0), -np.inf)
+
+        if len(values) > self.reservoir_size:
+            keep = part.rng.choice(len(values), self.reservoir_size, replace=False)
+            part.reservoir = values[np.sort(keep)]
+        else:
+            part.reservoir = values.copy()
+        return part
+
+    def merge(self, other):
+        """
+        Başka bir biriktiriciyi Chan formülleriyle birleştir
+
+        Args:
+            other (StreamingStats): Birleştirilecek biriktirici
+
+        Returns:
+            StreamingStats: self
+        """
+        if other.n is None:
+            return self
+        if self.n is None:
+            self.columns = other.columns
+            self._init_arrays(len(other.columns))
+
+        na, nb = self.n, other.n
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean          # delta[i, j]: i sütunu ortalama farkı
+            factor = np.where(n > 0, na * nb / n, 0.0)
+            weight_b = np.where(n > 0, nb / n, 0.0)
+        delta = np.nan_to_num(delta)
+
+        self.comoment = self.comoment + other.comoment + delta * delta.T * factor
+        self.m2 = self.m2 + other.m2 + delta ** 2 * factor
+        self.mean = self.mean + delta * weight_b
+        self.n = n
+
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.missing = self.missing + other.missing
+        self.reservoir = self._merge_reservoir(self.reservoir, self.rows, other.reservoir, other.rows)
+        self.rows += other.rows
+        return self
+
+    def _merge_reservoir(self, res_a, rows_a, res_b, rows_b):
+        """İki rezervuarı temsil ettikleri satır sayısıyla orantılı örnekle"""
+        if len(res_a) + len(res_b) <= self.reservoir_size:
+            return np.vstack([res_a, res_b])
+        take_a = self.rng.binomial(self.reservoir_size, rows_a / (rows_a + rows_b))
+        take_a = min(take_a, len(res_a))
+        take_b = min(self.reservoir_size - take_a, len(res_b))
+        pick_a = self.rng.choice(len(res_a), take_a, replace=False)
+        pick_b = self.rng.choice(len(res_b), take_b, replace=False)
+        return np.vstack([res_a[pick_a], res_b[pick_b]])
+
+    def describe(self):
+        """
+        `DataFrame.describe()` ile aynı biçimde özet tablo
+
+        Returns:
+            DataFrame: count, mean, std, min, 25%, 50%, 75%, max
+        """
+        count = np.diag(self.n)
+        mean = np.diag(self.mean)
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            std = np.sqrt(np.diag(self.m2) / (count - 1))
+            quantiles = np.nanpercentile(self.reservoir, [25, 50, 75], axis=0) \
+                if len(self.reservoir) else np.full((3, len(self.columns)), np.nan)
+        stats = np.vstack([
+            count,
+            np.where(count > 0, mean, np.nan),
+            np.where(count > 1, std, np.nan),
+            np.where(count > 0, self.min, np.nan),
+            quantiles,
+            np.where(count > 0, self.max, np.nan),
+        ])
+        return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                            columns=self.columns)
+
+    def missing_values(self):
+        """
+        Returns:
+            Series: Sütun bazında eksik değer sayısı
+        """
+        return pd.Series(self.missing, index=self.columns)
+
+    def corr(self):
+        """
+        Pearson korelasyon matrisi (çift bazlı eksik değer dışlama ile)
+
+        Returns:
+            DataFrame: Korelasyon matrisi
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denom = np.sqrt(self.m2 * self.m2.T)
+            corr = np.where((self.n > 1) & (denom > 0), self.comoment / denom, np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _chunk_stats(chunk, columns, reservoir_size):
+    """Worker süreçte tek parçanın istatistiklerini hesapla"""
+    return StreamingStats(columns, reservoir_size).update(chunk)
+
+
+def compute_streaming_stats(file_path, chunksize=100000, max_workers=None, reservoir_size=RESERVOIR_SIZE):
+    """
+    CSV dosyasını parçalar halinde okuyup istatistikleri paralel hesapla
+
+    Okuma tek geçişlidir; aynı anda en fazla 2 x max_workers parça bellekte
+    bulunur, dolayısıyla tepe bellek dosya boyutuna değil chunksize'a bağlıdır.
+
+    Args:
+        file_path (str): İşlenmiş CSV dosya yolu
+        chunksize (int): Parça başına satır sayısı
+        max_workers (int): Worker süreç sayısı (None: CPU sayısı)
+        reservoir_size (int): Yüzdelikler için rezervuar boyutu
+
+    Returns:
+        StreamingStats: Birleştirilmiş istatistikler
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    total = StreamingStats(reservoir_size=reservoir_size)
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=worker_init) as executor:
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            if total.columns is None:
+                total.columns = list(chunk.select_dtypes(include=[np.number]).columns)
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+            pending.add(executor.submit(_chunk_stats, chunk, total.columns, reservoir_size))
+
+        for future in wait(pending).done:
+            total.merge(future.result())
+
+    return total
@@ -0,0 +1,74 @@
+"""
+Ağaç Çıktılarından Vektörel Tahmin Aralıkları
+Her ağacın yaprak değerini `apply` + önceden hesaplanmış yaprak değeri
+tablosu ile tek geçişte alır; ortalama, standart sapma ve yüzdelikler üretir
+"""
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+DEFAULT_QUANTILES = (0.05, 0.95)
+
+
+class LeafValueTable:
+    """
+    Orman için düzleştirilmiş yaprak değeri tablosu
+
+    Ağaç başına yerel düğüm indeksleri, ağaç ofsetleri eklenerek tek bir
+    düz dizide indekslenir; böylece (satır x ağaç) tahmin matrisi tek bir
+    gelişmiş indeksleme işlemiyle elde edilir.
+    """
+
+    def __init__(self, estimator):
+        if isinstance(estimator, Pipeline):
+            self.preprocess = estimator[:-1] if len(estimator.steps) > 1 else None
+            forest = estimator.steps[-1][1]
+        else:
+            self.preprocess = None
+            forest = estimator
+        self.forest = forest
+
+        if hasattr(forest, "value_"):
+            # CompactForest: apply zaten global düğüm indeksi döndürür
+            self.values = forest.value_
+            self.offsets = None
+        elif hasattr(forest, "estimators_"):
+            trees = [est.tree_ for est in forest.estimators_]
+            sizes = np.array([t.node_count for t in trees])
+            self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            self.values = np.concatenate([t.value[:, 0, 0] for t in trees])
+        else:
+            raise TypeError(f"Ağaç topluluğu bekleniyordu: {type(forest).__name__}")
+        self.n_trees = len(self.offsets) if self.offsets is not None else forest.n_estimators
+
+    def per_tree(self, X):
+        """
+        Her satır için tüm ağaçların tahmini
+
+        Returns:
+            ndarray: (n_samples, n_trees)
+        """
+        if self.preprocess is not None:
+            X = self.preprocess.transform(X)
+        leaves = self.forest.apply(X)
+        if self.offsets is not None:
+            leaves = leaves + self.offsets
+        return self.values[leaves]
+
+    def predict_interval(self, X, quantiles=DEFAULT_QUANTILES):
+        """
+        Ortalama, standart sapma ve yüzdelikler
+
+        Args:
+            X (ndarray): (n, p) özellik matrisi
+            quantiles (iterable): 0-1 arası yüzdelikler
+
+        Returns:
+            dict: {'mean': (n,), 'std': (n,), 'quantiles': (n, q)}
+        """
+        outputs = self.per_tree(X)
+        return {
+            "mean": outputs.mean(axis=1, dtype=np.float64),
+            "std": outputs.std(axis=1, dtype=np.float64),
+            "quantiles": np.quantile(outputs, quantiles, axis=1).T,
+        }